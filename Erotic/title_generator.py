@@ -0,0 +1,4474 @@
+"""
+全自动标题生成器 v4
+支持自定义角色名字池，全自动随机生成标题
+
+实现都在本模块中，命令行入口是 auto_title_generator.py。作为模块导入时字节码
+会被缓存，冷启动只需加载 .pyc；少数功能才用到的标准库模块在使用处再导入。
+"""
+
+import functools
+import io
+import math
+import os
+import re
+import random
+import json
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+import argparse
+import bisect
+import itertools
+import sys
+import time
+
+# numpy、asyncio、multiprocessing 等导入耗时较长，只在批量采样、服务、
+# 多进程等功能首次使用时才导入，单个标题的调用不为它们付出启动时间
+np = None  # 由 _import_numpy() 按需填充
+
+
+def _import_numpy():
+    """首次需要时导入 NumPy（可选依赖，仅批量采样模式使用），未安装时返回None"""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+
+pa = None  # 由 _import_pyarrow() 按需填充
+
+
+def _import_pyarrow():
+    """首次需要时导入 pyarrow（可选依赖，仅 Parquet/Arrow 输出使用），未安装时返回None"""
+    global pa
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.ipc
+            import pyarrow.parquet
+        except ImportError:
+            return None
+        pa = pyarrow
+    return pa
+
+
+STYLE_NAMES: Dict[int, str] = {
+    1: "神经刀第一人称",
+    2: "机械降神·赛博淫语",
+    3: "古风淫词·淫艳诗词",
+    4: "街头涂鸦·毒液俚语",
+    5: "深夜电台·喘息ASMR",
+    6: "新闻报道式 / 调查报告式",  # 新增
+    7: "二次元论坛体 / 同人创作标题",  # 新增
+}
+
+# 风格模板表
+# 每个风格包含 lists（具名回退/固定词表）与 patterns（句式模板）。模板语法：
+#   {character}        角色名
+#   {类别:a|b}         从词汇库类别取词，类别缺失或为空时回退到 a|b
+#   {类别:@name}       同上，回退到本风格 lists 中的具名词表
+#   {:a|b} / {:@name}  固定候选词表，不查词汇库
+#   {#5-100}           闭区间内的随机整数
+#   末尾加 ?0.5        以该概率出现，否则为空字符串
+# 模板在生成器构造时编译一次，生成时只需选句式并拼接。
+STYLE_TEMPLATES: Dict[int, Dict] = {
+    # 风格1：神经刀第一人称 - 更加多样化，贴近rules.md示例
+    1: {
+        "lists": {
+            "features": ["小穴", "批", "臀浪", "黑丝", "白虎穴", "腿间"],
+            "actions": ["操", "社保", "夹断", "坐我嘴", "吸", "榨", "开闸", "掰开"],
+            "results": [
+                "喷脸",
+                "喷汁",
+                "浓精灌满",
+                "射了三次",
+                "内射",
+                "白浆",
+                "射我满屏",
+            ],
+            "states": ["麻了", "硬了", "疯了", "叫床", "高潮"],
+            "adjectives": ["紧", "骚", "淫荡", "湿"],
+            "times": ["清晨", "深夜", "下午", "这时间", "计时器响了"],
+            # 额外的俚语/特殊词汇，不在主要分类中但用于特定风格
+            "slang": ["鸡巴", "奶子", "鸭嘴", "USB接口", "榨汁机"],
+            "dialogue_starters": ["说", "问"],
+            "dialogue_parts": [
+                "裙子颜色是我鸡巴染的",
+                "要含着我鸡巴吸",
+                "吸到魔力变奶白色了",
+                "补魔要含着我鸡巴",
+            ],
+            "concepts": ["骑舞", "骑乘", "补魔", "鸭子坐合集"],
+        },
+        "patterns": [
+            # 模式1: 角色+特征+我直接+动作+结果 (如: 凛酱黑丝JK我直接社保腿间开闸白浆喷我脸上了)
+            "{character}{服装与装扮:黑丝|JK}{身体部位:@features}我直接{动作与感觉:@actions}{身体部位:@features}{动作与感觉:开闸}{高潮与射精:@results}",
+            # 模式2: 角色+身体部位+动作+我+身体部位+状态 (如: 妖刀姬白虎穴坐我嘴滴汁操我舌头麻了)
+            "{character}{身体部位:白虎穴|小穴}{动作与感觉:坐我嘴}{高潮与射精:滴汁}{动作与感觉:操我}{身体部位:舌头|脸|鸡巴} {状态与反应:@states}了",
+            # 模式3: 角色+动作+身体部位+甩我嘴里+结果 (如: 白毛狐狸精坐上来自己动奶子甩我嘴里射了三次)
+            "{character}{动作与感觉:坐上来自己动}{身体部位:奶子|大奶}甩我嘴里{高潮与射精:@results}",
+            # 模式4: 角色+特征+把我+动作+结果+动作 (如: 唐姐臀浪把我鸡巴夹断了浓精灌满她还在上面摇)
+            "{character}{身体部位:@features}把我{动作与感觉:@actions}{高潮与射精:@results}她还在上面{动作与感觉:摇|颤动}",
+            # 模式5: 我把+角色+的+身体部位+动作+结果 (如: 我把C.C.的小穴抽插内射)
+            "我把{character}的{身体部位:小穴|蜜穴|花穴}{动作与感觉:抽插|猛干|深插|干穿}{高潮与射精:内射|射爆|射满}",
+            # 模式6: 角色+的+身体部位+太+形容词+了+让我+动作+结果 (如: 角色的小穴太紧了让我忍不住射了)
+            "{character}的{身体部位:小穴|蜜穴|批}太{描述性形容词:@adjectives}了让我{动作与感觉:忍不住|不得不}{高潮与射精:射了|喷了|射爆}",
+            # 模式7: 角色+时间+状态+动作 (如: 萧薰儿清晨求我内射)
+            "{character}{时间与情境:@times}{状态与反应:求干|求饶|发情}{动作与感觉:@actions}",
+            # 模式8: 角色+身体部位+被+动作+到+状态 (如: 角色的小穴被操弄到发情)
+            "{character}的{身体部位:小穴|蜜穴|批}被{动作与感觉:操弄|猛干|蹂躏}到{状态与反应:发情|求饶|高潮|失禁}",
+            # 模式9: 概念+我把她们+身体部位+掰成+比喻+动作 (如: 鸭子坐合集？是我把她们屁股掰成鸭嘴操合集)
+            "{:@concepts}？是我把她们{身体部位:屁股}掰成{:@slang}{动作与感觉:操合集|猛干}",
+            # 模式10: 服装+掀起来直接+动作+对话 (如: 红色连衣裙掀起来直接开干妹妹说裙子颜色是我鸡巴染的)
+            "{服装与装扮:连衣裙|短裙|JK裙}掀起来直接{动作与感觉:开干|猛操}{:@dialogue_starters}{character}{:@dialogue_parts}",
+        ],
+    },
+    # 风格2：机械降神·赛博淫语 - 更多科技感，贴近rules.md示例
+    2: {
+        "lists": {
+            "states": [
+                "失控",
+                "紊乱",
+                "过载",
+                "故障",
+                "异常",
+                "宕机",
+                "崩溃",
+                "觉醒",
+                "进化",
+                "升华",
+            ],
+            "results": [
+                "喷射",
+                "高潮",
+                "溢出",
+                "短路",
+                "融化",
+                "解锁",
+                "激活",
+                "数据刷新",
+                "核心过热",
+                "能量耗尽",
+            ],
+            # 机械/赛博特有词汇，这些词汇可能不适合放入通用词汇库，因此在此处硬编码
+            "tech_terms": [
+                "系统错误",
+                "超载警报",
+                "程序失控",
+                "液压故障",
+                "计时器崩坏",
+                "接口异常",
+                "数据溢出",
+                "机械故障",
+                "电路短路",
+                "自动模式",
+                "防火墙失效",
+                "权限提升",
+                "缓冲区溢出",
+                "内存泄漏",
+                "进程崩溃",
+                "逻辑漏洞",
+                "代码注入",
+                "协议解析失败",
+                "AI核心受损",
+                "生物识别失败",
+                "散热系统失效",
+                "能量核心",
+                "传感过载",
+            ],
+            "mechanical_results": [
+                "喷出白色冷却液",
+                "注入精液",
+                "启动淫荡模式",
+                "高温爱液泄漏",
+                "高潮短路",
+                "白浆溢出",
+                "性爱系统崩溃",
+                "做爱机械故障",
+                "程序异常终止",
+                "防火墙被绕过",
+                "权限被夺取",
+                "爽到核心过热",
+                "能源耗尽",
+                "数据重置",
+                "线路烧毁",
+                "芯片爆裂",
+                "核心数据解体",
+                "主板融化",
+                "电磁脉冲",
+                "指令重写",
+                "全身痉挛",
+            ],
+            "body_tech": [
+                "机甲子宫",
+                "机械奶头",
+                "液压臀肌",
+                "电子白虎穴",
+                "系统接口",
+                "神经链接",
+                "生物芯片",
+                "内部散热器",
+                "核心引擎",
+                "敏感传感器",
+            ],
+            "time_references": ["这时间标记是叫床时长？", "5分40秒", "计时器响了"],
+        },
+        "patterns": [
+            # 模式1: 科技身体部位+状态+角色+身体部位+动作+科技液体 (如: 机甲子宫超载警报梵蒂白虎穴喷出白色冷却液)
+            "{:@body_tech}{状态与反应:@states}警报 {character}{身体部位:白虎穴|小穴}{动作与感觉:喷出|溢出}{:@mechanical_results}",
+            # 模式2: 角色+服装/装备+系统错误+被动动作+科技物质+结果 (如: 凛酱黑丝JK系统错误被我注入病毒代码后喷汁)
+            "{character}{服装与装扮:黑丝|JK|机甲}{:@tech_terms}被我{:注入病毒代码|物理连接}{:后喷汁|数据溢出|系统崩溃}",
+            # 模式3: 角色+程序状态+模式+第一人称动作+身体部位+比喻+动作 (如: 小舞程序失控骑乘模式把我鸡巴当USB接口狂插)
+            "{character}{:@tech_terms}{:骑乘模式|全自动模式|自动模式}把我{身体部位:鸡巴|身体}{:当USB接口狂插|当榨汁机|吸我鸡巴像榨汁机}",
+            # 模式4: 角色+计时器状态+身体部位+漏电+时间+结果 (如: 云曦计时器崩坏白虎穴漏电5分40秒射我满屏)
+            "{character}{:@tech_terms}{身体部位:白虎穴|身体}漏电{:@time_references}{高潮与射精:@results}",
+            # 模式5: 角色+科技身体部位+故障+身体部位+动作+科技液体 (如: 唐姐臀肌液压故障白虎穴喷出高温润滑液)
+            "{character}{:@body_tech}{:@tech_terms}{身体部位:白虎穴|小穴}{动作与感觉:喷出|溢出}{:@mechanical_results}",
+            # 模式6: 检测到+角色+身体科技+结果
+            "检测到 {character}{:@body_tech}{:@results}",
+            # 模式7: 警告：角色+系统状态+后果
+            "警告：{character}{:@tech_terms} {状态与反应:@states}",
+        ],
+    },
+    # 风格3：古风淫词·淫艳诗词 - 更多古典美，贴近rules.md示例
+    3: {
+        "lists": {
+            # 诗词题目
+            "poem_titles": [
+                "云雨赋",
+                "蝶恋花",
+                "灵修词",
+                "野合令",
+                "闺怨",
+                "春宫图",
+                "合欢赋",
+                "销魂记",
+                "巫山行",
+                "合欢词",
+                "春宵曲",
+                "采莲赋",
+                "凤求凰",
+                "长相思",
+                "醉花阴",
+                "一剪梅",
+                "如梦令",
+                "西江月",
+                "虞美人",
+            ],
+            "actions": [
+                "褪霓裳",
+                "舞罢腿开张",
+                "跪含龙",
+                "草间卧",
+                "卸钗环",
+                "解罗带",
+                "展玉体",
+                "舒玉体",
+                "露春光",
+                "展纤腰",
+                "移莲步",
+                "舒玉臂",
+                "娇喘",
+                "颤抖",
+                "吸尽元阳",
+            ],
+            "descriptions": [
+                "含露吐芳",
+                "春水泛滥",
+                "玉门开处涌甘泉",
+                "花露滴滴染红妆",
+                "玉体横陈迎君入",
+                "娇喘微微唤郎君",
+                "眉目含情脉脉水",
+                "玉指轻抚桃花源",
+                "芙蓉帐暖",
+                "红绡帐里展娇躯",
+                "玉臂轻摇引凤来",
+                "樱桃小口含龙吞",
+                "香汗淋漓",
+                "春潮涌动",
+                "淫香浮",
+            ],
+            "results": [
+                "玉浆溅我青衫湿",
+                "仙音颤颤绕梁",
+                "湿透鸳鸯枕半边",
+                "一夜销魂君莫问",
+                "春宵一刻值千金",
+                "巫山云雨共缠绵",
+                "娇喘连连夜未央",
+                "红绡帐暖度春宵",
+                "金风玉露一相逢",
+                "便胜却人间无数",
+                "此情可待成追忆",
+                "余韵悠长",
+                "魂飞魄散",
+                "化乳浆",
+            ],
+            "body_parts": ["白虎穴", "玉门", "花穴", "嫩乳", "香臀", "小穴"],
+            "places": ["卧榻", "林间", "花丛", "殿内", "厢房", "闺房", "草间"],
+            "times": ["月夜", "清晨", "午后", "黄昏", "春宵"],
+        },
+        "patterns": [
+            # 模式1: 《诗词名》角色动作，描述，结果 (如: 《云雨赋》仙子褪霓裳，白虎穴含露吐芳，玉浆溅我青衫湿)
+            "《{:@poem_titles}》{character}{动作与感觉:@actions}，{描述性形容词:@descriptions}，{高潮与射精:@results}",
+            # 模式2: 《诗词名》角色动作1，动作2+描述，结果 (如: 《灵修词》灵儿跪含龙，吸尽元阳化乳浆，仙音颤颤绕梁)
+            "《{:@poem_titles}》{character}{动作与感觉:@actions}，{动作与感觉:@actions}{高潮与射精:@results}，{状态与反应:仙音颤颤}",
+            # 模式3: 时间，角色于地点动作，结果 (如: 小医仙草间卧，白虎穴吞杵杵，药香混着淫香浮)
+            "{时间与情境:@times}，{character}于{位置与场景:@places}{动作与感觉:@actions}，{身体部位:@body_parts}{动作与感觉:吞杵杵}，{描述性形容词:药香混着淫香浮}",
+            # 模式4: 角色+身体部位+描述，引得结果
+            "{character}{身体部位:@body_parts}{描述性形容词:@descriptions}，引得{高潮与射精:@results}",
+            # 模式5: 角色+动作+身体部位+描述+结果 (如: 曹颖卸钗环，玉门开处涌甘泉，湿透鸳鸯枕半边)
+            "{character}{动作与感觉:@actions}，{身体部位:@body_parts}{描述性形容词:@descriptions}，{高潮与射精:@results}",
+        ],
+    },
+    # 风格4：街头涂鸦·毒液俚语 - 粗犷直接，贴近rules.md示例
+    4: {
+        "lists": {
+            "actions": ["操", "干", "射", "掰", "插", "顶"],
+            "results": [
+                "爆了",
+                "射了",
+                "喷了",
+                "漏了",
+                "潮了",
+                "湿了",
+                "紧了",
+                "麻了",
+                "操穿",
+                "干翻",
+                "射满",
+                "喷屏",
+            ],
+            "body_parts": ["小穴", "批", "大奶", "屁股", "嘴", "鸡巴"],
+            "states": [
+                "太骚了",
+                "顶不住",
+                "操疯了",
+                "爽死了",
+                "要死了",
+                "求饶了",
+                "发情了",
+            ],
+            # 俚语/口语评论
+            "comments": [
+                "小穴香香的",
+                "哥哥太猛了",
+                "太骚了 顶不住",
+                "操疯了",
+                "射爆了",
+                "爽死了",
+                "干穿了",
+                "要死了",
+                "求饶了",
+            ],
+            # 对话或补充说明
+            "dialogs": [
+                "妹妹说裙子颜色是我鸡巴染的",
+                "这时间标记是叫床时长？",
+                "我射她嘴里计时器响了",
+                "操穿",
+                "干翻",
+                "射满",
+                "喷屏",
+            ],
+            "time_contexts": ["今天", "昨晚", "刚才", "刚刚"],
+            "passive_verbs": [
+                "被操",
+                "被干",
+                "被射",
+                "被灌",
+                "被玩弄",
+                "被开发",
+                "被捅穿",
+            ],
+        },
+        "patterns": [
+            # 模式1: **角色** (如: **白毛狐狸精**)
+            "**{character}**",
+            # 模式2: 概念~评论 (如: 鸭子坐合集~我把她们屁股掰成鸭嘴操穿)
+            "{:鸭子坐合集|后入合集|丝袜合集}~我把她们{身体部位:屁股|小穴}掰成{:鸭嘴|两半}{动作与感觉:操穿|干爆}",
+            # 模式3: 动作+服装+直接干//对话 (如: 红色连衣裙掀起来直接开干妹妹说裙子颜色是我鸡巴染的)
+            "{服装与装扮:红裙|连衣裙}掀起来直接{动作与感觉:开干|猛干}//{:@dialogs}",
+            # 模式4: **角色+时间+描述** (如: **云曦计时叫床5分40秒**)
+            "**{character}{时间与情境:@time_contexts}{状态与反应:@states}{:计时叫床5分40秒|被操了一整晚}**",
+            # 模式5: 角色+身体部位+动作+身体部位+状态 (如: 妖刀姬白虎穴坐我嘴滴汁操我舌头麻了 - 虽然重复，但此风格也接受直白表达)
+            "{character}{身体部位:白虎穴|小穴}{动作与感觉:坐我嘴}{高潮与射精:滴汁}{动作与感觉:操我}{身体部位:舌头|脸|鸡巴} {状态与反应:@states}了",
+            # 模式6: 角色~评论
+            "{character}~{描述性形容词:@comments}",
+            # 模式7: 动词+角色~评论
+            "{动作与感觉:@actions}{character}~{描述性形容词:@comments}",
+            # 模式8: @角色 身体部位 动词了
+            "@{character} {身体部位:@body_parts} {高潮与射精:@results}了",
+            # 模式9: **时间+角色+被动动词**
+            "**{:@time_contexts}{character}{:@passive_verbs}**",
+        ],
+    },
+    # 风格5：深夜电台·喘息ASMR - 破碎、模糊、强调听觉，贴近rules.md示例
+    5: {
+        "lists": {
+            "features": ["黑丝", "小穴", "腿开", "臀浪", "奶子", "腿心", "玉门"],
+            "actions": ["吸", "榨", "夹", "灌", "抽插", "舔弄", "研磨"],
+            "results": [
+                "喷屏",
+                "爆",
+                "顶",
+                "麻了",
+                "白浆",
+                "高潮",
+                "溢出",
+                "湿透",
+                "颤抖",
+            ],
+            "states": ["娇喘", "呜咽", "酥麻", "失神", "求饶", "发骚", "呻吟"],
+            # ASMR特有语气词、声音描述
+            "onomatopoeia": [
+                "嗯...",
+                "啊...",
+                "哈啊...",
+                "哼...",
+                "呜...",
+                "滴答...滴答...",
+            ],
+            "sound_descriptions": [
+                "（喘息）",
+                "（私语）",
+                "（爱液声）",
+                "（淫水声）",
+                "（撞击声）",
+                "（肉体摩擦声）",
+            ],
+        },
+        "patterns": [
+            # 模式1: 角色...特征...动作...结果 (如: 凛酱...黑丝...腿开...白浆...喷屏)
+            "{character}...{身体部位:@features}...{动作与感觉:@actions}...{高潮与射精:@results}",
+            # 模式2: 角色...语气词...特征...语气词...动作... (如: 小舞...啊...小穴...嗯...吸...)
+            "{character}...{:@onomatopoeia}{身体部位:@features}...{:@onomatopoeia}{动作与感觉:@actions}...",
+            # 模式3: (声音描述)角色好状态...要...结果... (如: （喘息）角色好酥麻...要...高潮...)
+            "{:@sound_descriptions}{character}好{状态与反应:@states}...要...{高潮与射精:@results}...",
+            # 模式4: (私语)角色...程度...方向...（动作） (如: （私语）角色...再...深...一点...（抽插）)
+            "（私语）{character}...再...{:深|快|用力}...一点...（{动作与感觉:@actions}）",
+            # 模式5: 滴答...滴答...（声音）角色的特征...好状态... (如: 滴答...滴答...（爱液声）角色的腿心...好湿...)
+            "{:@onomatopoeia}{:@sound_descriptions}{character}的{身体部位:@features}...好{状态与反应:@states}...",
+            # 模式6: 角色...动作...状态...结果... (如: 灵儿...含...吸...魔力...奶白...操 - 简化和 ASMR 化)
+            "{character}...{动作与感觉:含|吸|吞}...{高潮与射精:魔力|奶白}...{动作与感觉:操|弄}...",
+            # 模式7: 角色...全自动...身体部位...动作...比喻...结果... (如: 小舞...全自动...小穴...吸...榨汁...爆)
+            "{character}...全自动...{身体部位:小穴|蜜穴}...{动作与感觉:@actions}...{:榨汁|狂吸}...{高潮与射精:@results}...",
+            # 模式8: 角色...特征...动作...结果...（附加状态）
+            "{character}...{身体部位:@features}...{动作与感觉:@actions}...{高潮与射精:@results}...（{状态与反应:@states}）",
+        ],
+    },
+    # 风格6：新闻报道式 / 调查报告式
+    6: {
+        "lists": {
+            # 核心词汇
+            "body_parts": ["私处", "小穴", "乳房", "臀部"],
+            "actions": ["淫乱", "暴露", "性行为", "高潮", "滥交"],
+            "states": ["失控", "异常", "发情", "沉沦"],
+            "times": ["深夜", "秘密", "私下"],
+            "locations": ["酒店", "地下室", "废弃工厂", "公共场所"],
+            "adjectives": ["惊人", "深度", "独家", "震惊", "异常"],
+            # 报道常用语
+            "report_terms": [
+                "【独家揭秘】",
+                "【深度报告】",
+                "【紧急曝光】",
+                "最新调查显示：",
+                "内部人士透露：",
+                "重磅新闻！",
+            ],
+            "verbs_report": ["曝光", "揭露", "发现", "披露", "证实", "捕捉到"],
+            "reactions": ["引发轩然大波", "令人震惊", "社会哗然", "引发争议", "触目惊心"],
+            "data_terms": ["数据显示", "报告指出", "据统计", "分析表明"],
+            "status_terms": ["私生活", "身体状态", "秘密档案", "行为模式"],
+        },
+        "patterns": [
+            # 模式1: 【独家揭秘】角色名 身体部位 惊人内幕曝光，数据显示...
+            "{:@report_terms}{character} {身体部位:@body_parts} {描述性形容词:@adjectives}内幕{:@verbs_report}，{:@data_terms}其{:@status_terms}{状态与反应:令人担忧|异常频繁|远超常人}",
+            # 模式2: 时间 地点 现场报道：角色名 被曝动作，引发社会反响
+            "{时间与情境:@times}，{位置与场景:@locations}现场报道：{character}被曝{动作与感觉:@actions}，{:@reactions}",
+            # 模式3: 深度报告：角色名 私生活紊乱，研究发现其特征存在异常状态
+            "【深度报告】{character}{:@status_terms}{状态与反应:紊乱|糜烂}，研究发现其{身体部位:生理机制|性激素}存在{状态与反应:@states}",
+            # 模式4: 惊人数据：角色名 在情境下动作次数高达数字次
+            "惊人数据：{character}在{时间与情境:深夜|隐秘角落}{:被|主动}{动作与感觉:强奸|侵犯|做爱}次数高达{#5-100}次",
+            # 模式5: 专家/研究员 警告：角色名 的身体部位或已不可逆状态
+            "【权威警示】专家警告：{character}的{身体部位:@body_parts}或已{状态与反应:不可逆受损|功能衰竭|过度开发|永久性扩张}",
+            # 模式6: [角色名] 秘密文件流出：揭露其不为人知的一面
+            "{:秘密文件|内部录像}流出：{character}不为人知的{状态与反应:淫乱|糜烂}内幕{:被揭露|大曝光}！",
+        ],
+    },
+    # 风格7：Pornhub 风格
+    7: {
+        "lists": {
+            "body_parts": ["嫩穴", "巨乳", "大屁股", "白虎", "黑丝美腿", "小穴"],
+            "actions": ["操", "颜射", "内射", "口爆", "强奸", "轮奸", "榨干", "深喉"],
+            "results": ["潮吹", "白浆喷射", "精液", "高潮", "失禁"],
+            "adjectives": ["紧致", "湿润", "淫荡", "骚", "绝美"],
+            "clothing": ["制服", "黑丝", "JK", "比基尼", "女仆装"],
+            "states": ["求饶", "哭喊", "发情", "被迫"],
+            "locations": ["办公室", "户外", "酒店", "客厅", "浴室"],
+            "times": ["第一次", "全程", "深夜"],
+            # Pornhub风格特有标签和修饰词
+            "ph_tags": [
+                "POV",
+                "Amateur",
+                "Cosplay",
+                "Big Tits",
+                "Anal",
+                "Gangbang",
+                "Creampie",
+                "Cuckold",
+                "NTR",
+                "Uncensored",
+                "HD",
+                "Full Video",
+                "VR",
+            ],
+            "intensifiers": ["疯狂", "极致", "高能", "超刺激", "史诗级"],
+            "preludes": ["[偷拍]", "[直击]", "[震惊]", "[劲爆]"],
+            "titles": ["小姐姐", "小妹妹", "熟女", "人妻", "邻家女孩"],
+        },
+        "patterns": [
+            # 模式1: [标签] 角色+形容词+身体部位+动作+结果 (例: [HD] 远坂凛黑丝巨乳被疯狂颜射潮吹！ )
+            "[{:@ph_tags}] {character}{服装与装扮:@clothing?0.5}{描述性形容词:@adjectives}{身体部位:@body_parts}被{:@intensifiers}{动作与感觉:@actions}{高潮与射精:@results}！",
+            # 模式2: [标签] 角色+情境+被动动作+状态 (例: [POV] 学生妹小舞课后被老师强奸到失禁)
+            "[{:@ph_tags}] {通用称呼:@titles}{character}{时间与情境:课后|放学后|深夜}{:被老师|被陌生人}{动作与感觉:强奸|猛操|轮奸}到{状态与反应:@states}",
+            # 模式3: [地点] 角色+特定行为+时长/画质 (例: [办公室] 人妻唐紫尘被同事无码内射，高清完整版)
+            "[{位置与场景:@locations}] {character}{动作与感觉:被灌满|被内射}，",
+            # 模式4: [NTR/COS] 角色+形容词+身体部位+被+动作+结果+完整度 (例: [NTR] 纯情小医仙嫩穴被路人操到高潮，高清完整版)
+            "[{:NTR|COS}] {描述性形容词:纯情|清纯}{character}{身体部位:@body_parts}被{:路人|狗|触手}{动作与感觉:@actions}到{高潮与射精:@results}，",
+            # 模式5: [偷拍/独家] 角色+行为+现场/后果 (例: [独家] 赵灵儿补魔仪式全程潮吹喷水，震惊)
+            "{:@preludes}{character}{时间与情境:@times}{动作与感觉:做爱|补魔|骑乘}仪式{:全程|现场} {高潮与射精:潮吹喷水|大喷特喷}，{描述性形容词:震惊|惊人}",
+            # 模式6: 角色+服装+核心动作+状态，时长 (例: 荷光者梵蒂机甲下黑丝榨汁机高潮痉挛，10分钟)
+            "{character}{服装与装扮:@clothing?0.7}{动作与感觉:深喉|榨汁|狂操}到{状态与反应:@states}",
+            # 模式7: 角色+主题+（身体部位/动作/结果） (例: 云曦时间标记是叫床时长？我射她嘴里计时器响了)
+            "{character}{:计时器|时间标记}是{:叫床|淫叫}时长？我{动作与感觉:射她嘴里|灌她满嘴}计时器响了",
+            # 模式8: [角色扮演] 角色+场景+动作+结果 (例: [女仆] 远坂凛女仆装在我面前黑丝露出，被我操到哭着求饶)
+            "[{服装与装扮:女仆|护士|兔女郎}]{character}{位置与场景:家里|卧室|浴室}，被我{动作与感觉:猛干|操翻}到{状态与反应:@states}",
+            # 模式9: 角色+形容词+身体部位+动作 (例: 白毛狐狸精骚穴坐脸狂喷汁)
+            "{character}{描述性形容词:@adjectives}{身体部位:@body_parts}{动作与感觉:坐脸|口含|坐嘴} {高潮与射精:狂喷汁|滴汁}",
+        ],
+    },
+}
+
+UNKNOWN_WORD = "未知词汇"  # 类别与回退列表都为空时的最终回退
+
+_SLOT_RE = re.compile(r"\{([^{}]*)\}")
+_OPTIONAL_RE = re.compile(r"^(.*)\?([0-9.]+)$")
+_RANGE_RE = re.compile(r"^#(-?\d+)-(-?\d+)$")
+
+
+_WEIGHT_RE = re.compile(r"(?:权重|weight)\s*[:：=]?\s*([0-9]*\.?[0-9]+)", re.IGNORECASE)
+
+
+def parse_weight(annotation: str) -> float:
+    """从词条注释中解析权重，如 "(权重: 2)"、"(weight=0.5)"，缺省为1"""
+    match = _WEIGHT_RE.search(annotation)
+    return float(match.group(1)) if match else 1.0
+
+
+class AliasTable:
+    """Walker 别名表：O(n) 构建，之后每次按权重抽取下标为 O(1)"""
+
+    __slots__ = ("n", "prob", "alias")
+
+    def __init__(self, weights: List[float]):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0 or min(weights) < 0:
+            raise ValueError("权重必须非负且总和为正数")
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # 剩余项因浮点误差留下，概率均视为1
+        self.n = n
+        # 紧凑数组存储，超大词表也只占每项16字节，且可被 NumPy 零拷贝使用
+        self.prob = array("d", prob)
+        self.alias = array("q", alias)
+
+    def sample(self, rng) -> int:
+        """抽取一个下标，rng 为 random 模块或 random.Random 实例"""
+        i = int(rng.random() * self.n)
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+    def sample_numpy(self, rng, size: int):
+        """用 NumPy Generator 一次抽取 size 个下标"""
+        i = rng.integers(0, self.n, size=size)
+        accept = rng.random(size) < np.asarray(self.prob)[i]
+        return np.where(accept, i, np.asarray(self.alias)[i])
+
+    def probabilities(self) -> List[float]:
+        """从别名表还原每个下标的抽取概率"""
+        probs = list(self.prob)
+        for i, (p, j) in enumerate(zip(self.prob, self.alias)):
+            if j != i:
+                probs[j] += 1.0 - p
+        return [p / self.n for p in probs]
+
+
+class WordStore:
+    """
+    紧凑的只读词表：所有词按 UTF-8 拼接为一个字节串，另存每个词的起始偏移。
+    每个词只占编码长度加一个偏移量，取用时才解码；支持 len、下标、切片和迭代。
+    """
+
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self, words: Iterable[str] = (), blob=None, offsets=None):
+        if blob is None:
+            blob, offsets = bytearray(), array("Q", [0])
+        self.blob = blob
+        self.offsets = offsets
+        for word in words:
+            self.append(word)
+
+    def append(self, word: str):
+        """追加一个词，仅用于构建阶段（blob 为 bytearray 时）"""
+        self.blob += word.encode("utf-8")
+        self.offsets.append(len(self.blob))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("WordStore index out of range")
+        return str(self.blob[self.offsets[index] : self.offsets[index + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        blob, offsets = self.blob, self.offsets
+        for i in range(len(offsets) - 1):
+            yield str(blob[offsets[i] : offsets[i + 1]], "utf-8")
+
+    def nbytes(self) -> int:
+        """字节串与偏移数组占用的字节数"""
+        return len(self.blob) + self.offsets.itemsize * len(self.offsets)
+
+
+class WordView:
+    """若干词表按顺序拼接的只读视图：只记录各部分的起始下标，不复制任何词"""
+
+    __slots__ = ("parts", "starts", "size")
+
+    def __init__(self, parts: Sequence[Sequence[str]]):
+        self.parts = tuple(parts)
+        self.starts = []
+        self.size = 0
+        for part in self.parts:
+            self.starts.append(self.size)
+            self.size += len(part)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.size))]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("WordView index out of range")
+        part = bisect.bisect_right(self.starts, index) - 1
+        return self.parts[part][index - self.starts[part]]
+
+    def __iter__(self) -> Iterator[str]:
+        return itertools.chain.from_iterable(self.parts)
+
+
+def build_alias_table(weights: List[float], label: str = "词表") -> AliasTable:
+    """
+    权重全为1时返回None（直接均匀抽取即可）。
+    权重全为0或含负数时无法按权重抽取，警告后同样返回None，退回均匀抽取。
+    """
+    if not weights or all(w == 1.0 for w in weights):
+        return None
+    if min(weights) < 0 or sum(weights) <= 0:
+        print(f"警告: {label} 的权重全为0或含负数，已改为均匀抽取", file=sys.stderr)
+        return None
+    return AliasTable(weights)
+
+
+class TemplateSlot:
+    """
+    模板中的一个待填充位置，pool 为 None 表示角色名，alias 非空时按权重抽取。
+    source 记录词池来源：vocabulary（词汇库）、fallback（回退列表）、
+    unknown（「未知词汇」占位）、list（模板内固定列表或数字区间）。
+    """
+
+    __slots__ = ("category", "pool", "probability", "alias", "source")
+
+    def __init__(
+        self,
+        category: str,
+        pool: Sequence[str] = None,
+        probability: float = 1.0,
+        alias: AliasTable = None,
+        source: str = "list",
+    ):
+        self.category = category
+        self.pool = pool
+        self.probability = probability
+        self.alias = alias
+        self.source = source
+
+    def distribution(self) -> Dict[str, float]:
+        """槽位取值的概率分布（相同的词合并），不适用于角色槽位"""
+        if self.alias is not None:
+            probs = self.alias.probabilities()
+        else:
+            probs = [1.0 / len(self.pool)] * len(self.pool)
+        dist: Dict[str, float] = {}
+        for word, p in zip(self.pool, probs):
+            dist[word] = dist.get(word, 0.0) + p * self.probability
+        if self.probability < 1.0:
+            dist[""] = dist.get("", 0.0) + 1.0 - self.probability
+        return dist
+
+
+def probability_histogram(probs) -> Dict[float, int]:
+    """
+    把概率列表压缩为 {概率: 取值个数}。概率保留6位有效数字，
+    使均匀词池只占一项，多个槽位的乘积也不会无限膨胀。
+    """
+    hist: Dict[float, int] = {}
+    for p in probs:
+        if p > 0:
+            key = float(f"{p:.6g}")
+            hist[key] = hist.get(key, 0) + 1
+    return hist
+
+
+def combine_histograms(
+    left: Dict[float, int], right: Dict[float, int]
+) -> Dict[float, int]:
+    """两个独立槽位的联合分布直方图"""
+    hist: Dict[float, int] = {}
+    for p, m in left.items():
+        for q, n in right.items():
+            key = float(f"{p * q:.6g}")
+            hist[key] = hist.get(key, 0) + m * n
+    return hist
+
+
+def mix_histograms(parts: List[Dict[float, int]]) -> Dict[float, int]:
+    """等概率从各部分中选一个（假设各部分的输出互不相同）"""
+    share = 1.0 / len(parts)
+    hist: Dict[float, int] = {}
+    for part in parts:
+        for p, m in part.items():
+            key = float(f"{p * share:.6g}")
+            hist[key] = hist.get(key, 0) + m
+    return hist
+
+
+def histogram_stats(hist: Dict[float, int], batch_size: int) -> Dict:
+    """
+    由直方图计算组合数、香农熵，以及 batch_size 次独立抽取中
+    与之前结果重复的期望比例 1 - Σ(1-(1-p)^n)/n。
+    """
+    combinations = sum(hist.values())
+    entropy = -sum(m * p * math.log2(p) for p, m in hist.items())
+    duplicate_rate = 0.0
+    if batch_size > 1:
+        distinct = sum(
+            -m * math.expm1(batch_size * math.log1p(-min(p, 1.0 - 1e-16)))
+            for p, m in hist.items()
+        )
+        duplicate_rate = max(0.0, 1.0 - distinct / batch_size)
+    return {
+        "combinations": combinations,
+        "entropy_bits": entropy,
+        "expected_duplicate_rate": duplicate_rate,
+    }
+
+
+class CompiledPattern:
+    """编译后的句式：字面量已烘焙进 format 字符串，槽位词池已解析完毕"""
+
+    __slots__ = ("style", "index", "template", "fmt", "slots", "fallbacks")
+
+    def __init__(self, style: int, index: int, template: str, fmt: str, slots):
+        self.style = style
+        self.index = index
+        self.template = template
+        self.fmt = fmt
+        self.slots = tuple(slots)
+        # 未能从词汇库取词的槽位 (类别, 来源)，供统计回退使用
+        self.fallbacks = tuple(
+            (slot.category, slot.source)
+            for slot in self.slots
+            if slot.source in ("fallback", "unknown")
+        )
+
+    def render(self, character: str, rng) -> str:
+        """用 rng（random 模块或 random.Random 实例）填充槽位"""
+        choice = rng.choice
+        values = []
+        for slot in self.slots:
+            if slot.pool is None:
+                values.append(character)
+            elif slot.probability < 1.0 and rng.random() >= slot.probability:
+                values.append("")
+            elif slot.alias is not None:
+                values.append(slot.pool[slot.alias.sample(rng)])
+            else:
+                values.append(choice(slot.pool))
+        return self.fmt.format(*values)
+
+
+def compile_template(
+    style: int, index: int, template: str, lists: Dict[str, List[str]], resolve
+) -> CompiledPattern:
+    """把模板字符串编译为 CompiledPattern。resolve(category, fallback) 返回 (词池, 别名表, 来源)"""
+    fmt_parts = []
+    slots = []
+    pos = 0
+    for match in _SLOT_RE.finditer(template):
+        literal = template[pos : match.start()]
+        fmt_parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        fmt_parts.append("{}")
+        pos = match.end()
+
+        spec = match.group(1).strip()
+        probability = 1.0
+        optional = _OPTIONAL_RE.match(spec)
+        if optional:
+            spec, probability = optional.group(1), float(optional.group(2))
+
+        if spec == "character":
+            slots.append(TemplateSlot("character"))
+            continue
+
+        number_range = _RANGE_RE.match(spec)
+        if number_range:
+            low, high = int(number_range.group(1)), int(number_range.group(2))
+            pool = tuple(str(n) for n in range(low, high + 1))
+            slots.append(TemplateSlot("", pool, probability))
+            continue
+
+        category, _, fallback_spec = spec.partition(":")
+        if fallback_spec.startswith("@"):
+            fallback = lists[fallback_spec[1:]]
+        else:
+            fallback = [w for w in fallback_spec.split("|") if w]
+        pool, alias, source = resolve(category.strip(), fallback)
+        slots.append(TemplateSlot(category.strip(), pool, probability, alias, source))
+
+    literal = template[pos:]
+    fmt_parts.append(literal.replace("{", "{{").replace("}", "}}"))
+    return CompiledPattern(style, index, template, "".join(fmt_parts), slots)
+
+
+class CompiledStyles(dict):
+    """
+    按风格惰性编译的句式表 {风格: [CompiledPattern]}。
+    首次取某个风格时才编译并存入字典，之后的取用就是普通的字典查找；
+    成员判断、遍历和长度按全部已定义的风格计算，遍历 items()/values() 会编译全部风格。
+    """
+
+    def __init__(self, templates: Dict[int, Dict], resolve):
+        super().__init__()
+        self.templates = templates
+        self.resolve = resolve
+
+    def __missing__(self, style: int) -> List[CompiledPattern]:
+        if style not in self.templates:
+            raise KeyError(style)
+        table = self.templates[style]
+        patterns = [
+            compile_template(style, index, template, table["lists"], self.resolve)
+            for index, template in enumerate(table["patterns"])
+        ]
+        self[style] = patterns
+        return patterns
+
+    def __contains__(self, style) -> bool:
+        return style in self.templates
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.templates)
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def keys(self):
+        return self.templates.keys()
+
+    def items(self):
+        return [(style, self[style]) for style in self.templates]
+
+    def values(self):
+        return [self[style] for style in self.templates]
+
+    def get(self, style, default=None):
+        return self[style] if style in self.templates else default
+
+    def compiled(self) -> List[int]:
+        """已经编译过的风格"""
+        return list(super().keys())
+
+
+CACHE_VERSION = 6  # 解析结果或缓存格式变化时递增，使旧缓存失效
+# 缓存文件的缺省值：放在用户缓存目录下，按源文件的绝对路径区分（见 default_cache_file）。
+# 不放在当前目录，避免加载别人放进工作目录的 pickle 文件
+DEFAULT_CACHE_FILE = "auto"
+# 写入缓存的已解析数据
+_CACHED_FIELDS = (
+    "vocabulary",
+    "vocabulary_weights",
+    "character_pool",
+    "character_weights",
+    "removed_characters",
+)
+# 热加载时整体替换的字段：解析结果及由其派生的采样器与编译句式
+_RELOADED_FIELDS = _CACHED_FIELDS + (
+    "_rules_examples",
+    "_reference_index",
+    "_character_sampler",
+    "word_alias_tables",
+    "compiled_styles",
+)
+
+SNAPSHOT_MAGIC = b"ATGSNAP1"  # 快照文件头：魔数 + 元数据偏移和长度（各8字节）
+SNAPSHOT_VERSION = 1
+STREAM_BUFFER_SIZE = 1 << 20  # 流式输出的写缓冲大小
+BULK_CHUNK_SIZE = 100_000  # 流式批量采样时每块的标题数
+SHARD_WINDOW_FACTOR = 2  # 多进程时每个工作进程最多对应的在途分片数
+
+DEFAULT_CHARACTER = "某人"  # 角色池为空时的回退角色
+WEIGHTS_KEY = "__weights__"  # characters.json 中存放角色权重的保留键
+REMOVED_KEY = "__removed__"  # characters.json 中记录被删除的内置默认角色的保留键
+JOURNAL_SUFFIX = ".journal"  # 角色池增量日志 = 角色池文件名 + 该后缀
+JOURNAL_COMPACT_THRESHOLD = 10_000  # 日志条目超过该数量时合并回角色池快照
+DEFAULT_IMPORT_CATEGORY = "自定义角色"  # 导入记录未给出分类时归入的分类
+IMPORT_FORMATS = ("auto", "csv", "jsonl", "text")
+
+CHARACTER_WEIGHTINGS = ("category", "character")
+
+
+def normalize_character_name(name: str) -> str:
+    """角色名规范化：NFKC（全角转半角等），去掉首尾空白并把连续空白合并为一个空格"""
+    import unicodedata
+
+    return " ".join(unicodedata.normalize("NFKC", name).split())
+
+
+def default_cache_file(sources: Sequence[str]) -> str:
+    """
+    源文件对应的缓存路径：$XDG_CACHE_HOME（Windows 为 %LOCALAPPDATA%，缺省 ~/.cache）
+    下的 auto_title_generator 目录，文件名取自源文件绝对路径的哈希
+    """
+    import hashlib
+
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME")
+    base = base or os.path.join(os.path.expanduser("~"), ".cache")
+    paths = "\0".join(os.path.abspath(path) for path in sources)
+    digest = hashlib.blake2b(paths.encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(base, "auto_title_generator", f"cache-{digest}.pkl")
+
+
+def character_key(name: str) -> str:
+    """判断角色是否重复时使用的键：规范化后再做大小写折叠（只影响拉丁等有大小写的文字）"""
+    return normalize_character_name(name).casefold()
+
+
+def normalize_character_pool(
+    pool: Dict[str, List[str]]
+) -> Tuple[Dict[str, List[str]], Dict[str, int]]:
+    """
+    规范化角色池的每个名字，并在分类内按 character_key 去重（保留首次出现的写法）。
+    返回 (新角色池, 统计)，统计包括改写的名字数、移除的重复数和空名字数。
+    """
+    stats = {"normalized": 0, "duplicates": 0, "empty": 0}
+    result = {}
+    for category, characters in pool.items():
+        seen = set()
+        cleaned = []
+        for name in characters or []:
+            normalized = normalize_character_name(str(name))
+            if not normalized:
+                stats["empty"] += 1
+                continue
+            key = normalized.casefold()
+            if key in seen:
+                stats["duplicates"] += 1
+                continue
+            if normalized != name:
+                stats["normalized"] += 1
+            seen.add(key)
+            cleaned.append(normalized)
+        result[category] = cleaned
+    return result, stats
+
+
+class CharacterSampler:
+    """
+    角色池的扁平采样器，从合并后的角色池构建一次。
+    category 模式：先均匀选类别再在类别内选角色（原有行为）。
+    character 模式：在所有角色中抽取。
+    weights 为 {角色名: 权重}，未列出的角色权重为1；有非1权重时用别名表抽取。
+    """
+
+    __slots__ = (
+        "mode",
+        "flat",
+        "starts",
+        "sizes",
+        "category_count",
+        "total",
+        "category_tables",
+        "table",
+        "categories",
+        "_category_index",
+    )
+
+    def __init__(
+        self,
+        pool: Dict[str, List[str]],
+        mode: str = "category",
+        weights: Dict[str, float] = None,
+    ):
+        if mode not in CHARACTER_WEIGHTINGS:
+            raise ValueError(f"无效的角色权重模式，可选：{list(CHARACTER_WEIGHTINGS)}")
+        weights = weights or {}
+        self.mode = mode
+        parts, starts, sizes, tables, categories = [], [], [], [], []
+        total = 0
+        for category, characters in pool.items():
+            if characters:
+                categories.append(category)
+                parts.append(characters)
+                starts.append(total)
+                sizes.append(len(characters))
+                total += len(characters)
+                tables.append(
+                    build_alias_table(
+                        [weights.get(c, 1.0) for c in characters], f"角色分类 {category}"
+                    )
+                    if weights
+                    else None
+                )
+        # 快照中的紧凑词表用视图拼接，不在每个进程里逐个解码成字符串
+        if any(isinstance(part, WordStore) for part in parts):
+            self.flat = WordView(parts)
+        else:
+            self.flat = tuple(itertools.chain.from_iterable(parts))
+        self.starts = tuple(starts)
+        self.sizes = tuple(sizes)
+        self.category_count = len(sizes)
+        self.total = total
+        self.category_tables = tuple(tables)
+        self.categories = tuple(categories)
+        self._category_index = None
+        self.table = (
+            build_alias_table([weights.get(c, 1.0) for c in self.flat], "角色池")
+            if weights
+            else None
+        )
+
+    def sample(self, rng) -> str:
+        """抽取一个角色，rng 为 random 模块或 random.Random 实例"""
+        if not self.total:
+            return DEFAULT_CHARACTER
+        if self.mode == "character":
+            if self.table is not None:
+                return self.flat[self.table.sample(rng)]
+            return self.flat[int(rng.random() * self.total)]
+        k = int(rng.random() * self.category_count)
+        table = self.category_tables[k]
+        if table is not None:
+            return self.flat[self.starts[k] + table.sample(rng)]
+        return self.flat[self.starts[k] + int(rng.random() * self.sizes[k])]
+
+    def category_of(self, name: str) -> str:
+        """角色所属的分类（出现在多个分类时取第一个），不在角色池中时返回None"""
+        if self._category_index is None:
+            # 只在需要输出分类时构建，避免普通生成为大角色池多建一份字典
+            index = {}
+            for category, start, size in zip(self.categories, self.starts, self.sizes):
+                for character in self.flat[start : start + size]:
+                    index.setdefault(character, category)
+            self._category_index = index
+        return self._category_index.get(name)
+
+    def distribution(self) -> Dict[str, float]:
+        """角色的抽取概率分布（同名角色合并）"""
+        if not self.total:
+            return {DEFAULT_CHARACTER: 1.0}
+        dist: Dict[str, float] = {}
+        if self.mode == "character":
+            probs = (
+                self.table.probabilities()
+                if self.table is not None
+                else [1.0 / self.total] * self.total
+            )
+            for name, p in zip(self.flat, probs):
+                dist[name] = dist.get(name, 0.0) + p
+            return dist
+        for start, size, table in zip(self.starts, self.sizes, self.category_tables):
+            probs = table.probabilities() if table is not None else [1.0 / size] * size
+            for name, p in zip(self.flat[start : start + size], probs):
+                dist[name] = dist.get(name, 0.0) + p / self.category_count
+        return dist
+
+
+class TitleRecord(NamedTuple):
+    """带生成元数据的标题：pattern_id 为句式在本风格中的下标"""
+
+    title: str
+    style: int
+    pattern_id: int
+    character: str
+    category: str
+
+
+class PatternSpace:
+    """
+    一个句式的全部取值组合，按混合进制编号：每个槽位是一位，
+    基数为该槽位的不同取值个数，最后一个槽位为最低位（与 itertools.product 顺序一致）。
+    """
+
+    __slots__ = ("pattern", "values", "size")
+
+    def __init__(self, pattern: CompiledPattern, characters: Tuple[str, ...]):
+        values = []
+        for slot in pattern.slots:
+            if slot.pool is None:
+                values.append(characters)
+            else:
+                dist = slot.distribution()
+                values.append(tuple(word for word, p in dist.items() if p > 0))
+        self.pattern = pattern
+        self.values = tuple(values)
+        self.size = math.prod(len(v) for v in values)
+
+    def title_at(self, index: int) -> str:
+        """第 index 个组合对应的标题"""
+        digits = []
+        for values in reversed(self.values):
+            index, digit = divmod(index, len(values))
+            digits.append(values[digit])
+        return self.pattern.fmt.format(*reversed(digits))
+
+    def __iter__(self) -> Iterator[str]:
+        fmt = self.pattern.fmt
+        for combo in itertools.product(*self.values):
+            yield fmt.format(*combo)
+
+
+class TitleSpace:
+    """
+    若干句式空间首尾相接组成的整数索引空间 [0, size)。
+    不同组合拼接后恰好相同的标题极少，这里不做扣除。
+    """
+
+    def __init__(self, spaces: List[PatternSpace]):
+        self.spaces = spaces
+        self.offsets = []
+        self.size = 0
+        for space in spaces:
+            self.offsets.append(self.size)
+            self.size += space.size
+
+    def title_at(self, index: int) -> str:
+        """第 index 个标题"""
+        if not 0 <= index < self.size:
+            raise IndexError(f"索引超出范围 [0, {self.size})")
+        k = bisect.bisect_right(self.offsets, index) - 1
+        return self.spaces[k].title_at(index - self.offsets[k])
+
+    def __iter__(self) -> Iterator[str]:
+        """按索引顺序惰性枚举全部标题"""
+        for space in self.spaces:
+            yield from space
+
+    def sample(self, k: int, rng) -> Iterator[str]:
+        """无放回均匀抽取 k 个不同索引对应的标题，内存 O(k)"""
+        if k > self.size:
+            raise ValueError(f"抽样数量 {k} 超过标题空间大小 {self.size}")
+        if self.size <= sys.maxsize:
+            indices = rng.sample(range(self.size), k)
+        else:
+            # 超出 range 长度上限时空间远大于 k，拒绝采样几乎不会重试
+            seen = set()
+            indices = []
+            while len(indices) < k:
+                index = rng.randrange(self.size)
+                if index not in seen:
+                    seen.add(index)
+                    indices.append(index)
+        for index in indices:
+            yield self.title_at(index)
+
+
+def title_bigrams(title: str) -> frozenset:
+    """标题的字符二元组集合，不足两个字符时为标题本身"""
+    if len(title) < 2:
+        return frozenset((title,))
+    return frozenset(title[i : i + 2] for i in range(len(title) - 1))
+
+
+class ReferenceIndex:
+    """
+    rules.md 示例中生成标题的字符二元组倒排索引，按风格分组。
+    nearest 只遍历与标题共享二元组的示例，返回其中 Jaccard 相似度最高的一个；
+    风格为None时在全部示例中查找。
+    """
+
+    def __init__(self, examples: Dict[str, List[Dict]]):
+        style_by_name = {name: style for style, name in STYLE_NAMES.items()}
+        self.references: Dict[int, List[str]] = {}
+        self._postings: Dict[int, Dict[str, List[int]]] = {}
+        self._sizes: Dict[int, List[int]] = {}
+        for name, items in examples.items():
+            for item in items:
+                style = item.get("style") or style_by_name.get(name)
+                self._add(None, item["generated"])
+                if style is not None:
+                    self._add(style, item["generated"])
+
+    def _add(self, style: int, reference: str):
+        references = self.references.setdefault(style, [])
+        postings = self._postings.setdefault(style, {})
+        sizes = self._sizes.setdefault(style, [])
+        grams = title_bigrams(reference)
+        for gram in grams:
+            postings.setdefault(gram, []).append(len(references))
+        references.append(reference)
+        sizes.append(len(grams))
+
+    def nearest(self, title: str, style: int = None) -> Tuple[float, str]:
+        """返回 (相似度, 最近示例)；该风格没有示例或没有共同二元组时为 (0.0, None)"""
+        postings = self._postings.get(style)
+        if not postings:
+            return 0.0, None
+        grams = title_bigrams(title)
+        overlaps: Dict[int, int] = {}
+        for gram in grams:
+            for ref in postings.get(gram, ()):
+                overlaps[ref] = overlaps.get(ref, 0) + 1
+        if not overlaps:
+            return 0.0, None
+        sizes = self._sizes[style]
+        size = len(grams)
+        score, ref = max(
+            (overlap / (size + sizes[ref] - overlap), ref)
+            for ref, overlap in overlaps.items()
+        )
+        return score, self.references[style][ref]
+
+    def score(self, title: str, style: int = None) -> float:
+        """与最近示例的 Jaccard 相似度（0-1）"""
+        return self.nearest(title, style)[0]
+
+
+METRICS_LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 1e-3)
+
+
+def _prometheus_label(value) -> str:
+    """转义 Prometheus 标签值"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class TitleMetrics:
+    """
+    生成过程的统计：各风格/句式的标题数、各风格渲染耗时直方图，
+    以及各类别回退到硬编码列表（fallback）或「未知词汇」（unknown）的次数。
+    句式的回退槽位在编译时已确定，每次使用该句式都计入（可选槽位本次为空也计入）。
+    只在单线程中更新；多进程分片时各工作进程的统计不会汇总回主进程。
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = METRICS_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.pattern_titles: Dict[Tuple[int, int], int] = {}
+        # {风格: 各桶计数（最后一个为 +Inf）}、{风格: 耗时总和}
+        self.style_latency: Dict[int, List[int]] = {}
+        self.style_seconds: Dict[int, float] = {}
+        self.fallback_hits: Dict[Tuple[str, str], int] = {}
+
+    def observe(self, pattern: CompiledPattern, seconds: float):
+        """记录一次句式渲染及其耗时"""
+        key = (pattern.style, pattern.index)
+        self.pattern_titles[key] = self.pattern_titles.get(key, 0) + 1
+        histogram = self.style_latency.get(pattern.style)
+        if histogram is None:
+            histogram = [0] * (len(self.buckets) + 1)
+            self.style_latency[pattern.style] = histogram
+            self.style_seconds[pattern.style] = 0.0
+        histogram[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.style_seconds[pattern.style] += seconds
+        for category, source in pattern.fallbacks:
+            self.count_fallback(category, source)
+
+    def observe_bulk(self, pattern: CompiledPattern, count: int):
+        """批量路径按句式分组渲染，只记录数量不计耗时"""
+        key = (pattern.style, pattern.index)
+        self.pattern_titles[key] = self.pattern_titles.get(key, 0) + count
+        for category, source in pattern.fallbacks:
+            self.count_fallback(category, source, count)
+
+    def count_fallback(self, category: str, source: str, count: int = 1):
+        key = (category, source)
+        self.fallback_hits[key] = self.fallback_hits.get(key, 0) + count
+
+    def to_dict(self) -> Dict:
+        """导出为可 JSON 序列化的字典"""
+        styles = {}
+        for (style, index), count in sorted(self.pattern_titles.items()):
+            entry = styles.setdefault(str(style), {"titles": 0, "patterns": {}})
+            entry["titles"] += count
+            entry["patterns"][str(index)] = count
+        for style, histogram in self.style_latency.items():
+            entry = styles[str(style)]
+            entry["timed_titles"] = sum(histogram)
+            entry["seconds_sum"] = self.style_seconds[style]
+            entry["latency_buckets"] = {
+                str(bound): sum(histogram[: i + 1])
+                for i, bound in enumerate(self.buckets)
+            }
+        fallbacks: Dict[str, Dict[str, int]] = {}
+        for (category, source), count in sorted(self.fallback_hits.items()):
+            fallbacks.setdefault(category, {})[source] = count
+        return {"styles": styles, "fallback_hits": fallbacks}
+
+    def to_prometheus(self) -> str:
+        """导出为 Prometheus 文本格式"""
+        lines = [
+            "# HELP title_generator_titles_total 按风格和句式统计的生成标题数",
+            "# TYPE title_generator_titles_total counter",
+        ]
+        for (style, index), count in sorted(self.pattern_titles.items()):
+            labels = f'style="{style}",pattern="{index}"'
+            lines.append(f"title_generator_titles_total{{{labels}}} {count}")
+        lines += [
+            "# HELP title_generator_render_seconds 各风格单个标题的渲染耗时",
+            "# TYPE title_generator_render_seconds histogram",
+        ]
+        for style, histogram in sorted(self.style_latency.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), histogram):
+                cumulative += count
+                labels = f'style="{style}",le="{bound}"'
+                lines.append(
+                    f"title_generator_render_seconds_bucket{{{labels}}} {cumulative}"
+                )
+            lines.append(
+                f'title_generator_render_seconds_sum{{style="{style}"}} '
+                f"{self.style_seconds[style]}"
+            )
+            lines.append(
+                f'title_generator_render_seconds_count{{style="{style}"}} {cumulative}'
+            )
+        lines += [
+            "# HELP title_generator_fallback_total 未能从词汇库取词而使用回退列表或占位词的次数",
+            "# TYPE title_generator_fallback_total counter",
+        ]
+        for (category, source), count in sorted(self.fallback_hits.items()):
+            labels = f'category="{_prometheus_label(category)}",source="{source}"'
+            lines.append(f"title_generator_fallback_total{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class AutoTitleGenerator:
+    def __init__(
+        self,
+        name_file: str = "name.md",
+        rules_file: str = "rules.md",
+        character_pool_file: str = "characters.json",
+        character_weighting: str = "category",
+        cache_file: str = DEFAULT_CACHE_FILE,
+        seed: int = None,
+        snapshot_file: str = None,
+    ):
+        """
+        初始化生成器。
+        cache_file: 解析缓存文件，缺省为用户缓存目录下按源文件区分的文件；
+            为None时不读写解析缓存。
+        seed: 本实例随机数生成器的种子，指定后生成结果可复现。
+        snapshot_file: 指定时从 write_snapshot 生成的二进制快照 mmap 加载，
+            不再读取 Markdown/JSON 源文件；角色池只读。
+        """
+        # 每个实例独立的随机数生成器，不与全局 random 模块或其他实例互相干扰
+        self.rng = random.Random(seed)
+        self.sources = (name_file, rules_file, character_pool_file)
+        self.character_pool_file = character_pool_file
+        self.character_journal_file = character_pool_file + JOURNAL_SUFFIX
+        self._journal_entries = None  # 日志现有条目数，首次追加时统计
+        self.cache_file = cache_file
+        self.snapshot_file = snapshot_file
+        # 缓存和热加载都要感知角色池日志的变化；快照模式下只看快照文件
+        if snapshot_file:
+            self._watched_files = (snapshot_file,)
+        else:
+            self._watched_files = self.sources + (self.character_journal_file,)
+        sources = self._watched_files
+        if cache_file == DEFAULT_CACHE_FILE:
+            cache_file = self.cache_file = default_cache_file(sources)
+        # 加载前记录源文件状态，加载期间发生的修改会在下次轮询时被发现
+        self._source_key = self._cache_key(sources)
+        # 本次加载时规范化角色池的统计；从缓存恢复时文件早已规范化，均为0
+        self.character_pool_stats = {"normalized": 0, "duplicates": 0, "empty": 0}
+        if snapshot_file:
+            self._load_snapshot(snapshot_file)
+        elif not (cache_file and self._load_cache(cache_file, sources)):
+            # 由加载函数填充：{类别: 与词表对齐的权重列表}、{角色名: 权重}
+            self.vocabulary_weights: Dict[str, List[float]] = {}
+            self.character_weights: Dict[str, float] = {}
+            # {分类: [角色名]}，合并内置默认角色池时跳过这些已被删除的角色
+            self.removed_characters: Dict[str, List[str]] = {}
+            self.vocabulary = self._load_vocabulary(name_file)
+            self.character_pool = self._load_character_pool(character_pool_file)
+            if cache_file:
+                self._save_cache(cache_file, sources)
+        self.character_weighting = character_weighting
+        self._character_sampler = None  # 首次抽取时构建，add_character 时失效
+        # 规则示例不参与生成，首次访问 rules_examples 时才解析；快照中已带有
+        if not snapshot_file:
+            self._rules_examples = None
+        self._reference_index = None  # 首次做相似度评分时由规则示例构建
+        self.metrics: TitleMetrics = None  # enable_metrics() 后才统计
+        if not snapshot_file:  # 快照中已带有别名表
+            self.word_alias_tables: Dict[str, AliasTable] = {}
+            for category, weights in self.vocabulary_weights.items():
+                table = build_alias_table(weights, f"词汇类别 {category}")
+                if table is not None:
+                    self.word_alias_tables[category] = table
+        self.compiled_styles = self._compile_templates()
+
+    def __getstate__(self):
+        """快照支撑的实例只传快照路径（如传给工作进程），接收方重新映射同一文件"""
+        if self.snapshot_file is None:
+            return self.__dict__
+        return {
+            "snapshot_file": self.snapshot_file,
+            "character_weighting": self.character_weighting,
+            "rng_state": self.rng.getstate(),
+        }
+
+    def __setstate__(self, state):
+        if "rng_state" not in state:
+            self.__dict__.update(state)
+            return
+        self.__init__(
+            character_weighting=state["character_weighting"],
+            cache_file=None,
+            snapshot_file=state["snapshot_file"],
+        )
+        self.rng.setstate(state["rng_state"])
+
+    def write_snapshot(self, file_path: str):
+        """
+        把解析好的词库（含权重与别名表）、角色池和规则示例写成只读二进制快照。
+        布局：文件头、8字节对齐的各数据段（UTF-8 字节串、偏移、权重、别名表），
+        末尾为记录各段位置的 JSON 元数据。
+        先写临时文件再替换，已映射旧快照的进程不受影响。
+        """
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "vocabulary": {},
+            "characters": {},
+            "character_weights": self.character_weights,
+            "rules_examples": self.rules_examples,
+        }
+        tmp_file = f"{file_path}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(SNAPSHOT_MAGIC + bytes(16))
+
+            def section(data) -> List[int]:
+                f.write(bytes(-f.tell() % 8))
+                start = f.tell()
+                f.write(data)
+                return [start, f.tell() - start]
+
+            def store_sections(words) -> Dict[str, List[int]]:
+                if not isinstance(words, WordStore):
+                    words = WordStore(words)
+                return {
+                    "blob": section(words.blob),
+                    "offsets": section(array("Q", words.offsets)),
+                }
+
+            for category, words in self.vocabulary.items():
+                entry = store_sections(words)
+                entry["weights"] = section(
+                    array("d", self.vocabulary_weights[category])
+                )
+                table = self.word_alias_tables.get(category)
+                if table is not None:
+                    entry["alias"] = {
+                        "prob": section(array("d", table.prob)),
+                        "alias": section(array("q", table.alias)),
+                    }
+                meta["vocabulary"][category] = entry
+            for category, characters in self.character_pool.items():
+                meta["characters"][category] = store_sections(characters)
+
+            meta_offset = f.tell()
+            data = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+            f.write(data)
+            f.seek(len(SNAPSHOT_MAGIC))
+            f.write(struct.pack("<QQ", meta_offset, len(data)))
+        os.replace(tmp_file, file_path)
+
+    def _load_snapshot(self, file_path: str):
+        """mmap 打开快照，词表、权重和别名表都是映射内存上的零拷贝视图"""
+        import mmap
+
+        with open(file_path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{file_path} 不是有效的标题生成器快照")
+        meta_offset, meta_length = struct.unpack_from(
+            "<QQ", mapped, len(SNAPSHOT_MAGIC)
+        )
+        meta = json.loads(mapped[meta_offset : meta_offset + meta_length])
+        if meta["version"] != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"快照版本 {meta['version']} 与当前版本 {SNAPSHOT_VERSION} 不符，请重新构建"
+            )
+        view = memoryview(mapped)
+
+        def section(span: List[int], fmt: str = None):
+            start, length = span
+            data = view[start : start + length]
+            return data.cast(fmt) if fmt else data
+
+        def open_store(entry: Dict) -> WordStore:
+            return WordStore(
+                blob=section(entry["blob"]), offsets=section(entry["offsets"], "Q")
+            )
+
+        self.vocabulary = {}
+        self.vocabulary_weights = {}
+        self.word_alias_tables = {}
+        for category, entry in meta["vocabulary"].items():
+            self.vocabulary[category] = open_store(entry)
+            self.vocabulary_weights[category] = section(entry["weights"], "d")
+            if "alias" in entry:
+                table = AliasTable.__new__(AliasTable)
+                table.n = len(self.vocabulary[category])
+                table.prob = section(entry["alias"]["prob"], "d")
+                table.alias = section(entry["alias"]["alias"], "q")
+                self.word_alias_tables[category] = table
+        self.character_pool = {
+            category: open_store(entry)
+            for category, entry in meta["characters"].items()
+        }
+        self.character_weights = meta["character_weights"]
+        self.removed_characters = {}  # 快照中的角色池只读
+        self._rules_examples = meta["rules_examples"]
+
+    @staticmethod
+    def _cache_key(sources: Tuple[str, ...]) -> Tuple:
+        """由源文件的路径、mtime和大小组成缓存键，不存在的文件记为None"""
+        key = [CACHE_VERSION]
+        for path in sources:
+            try:
+                stat = os.stat(path)
+                key.append((os.path.abspath(path), stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                key.append((os.path.abspath(path), None))
+        return tuple(key)
+
+    @staticmethod
+    def _content_digest(sources: Tuple[str, ...]) -> str:
+        """源文件内容的哈希：mtime/大小不变的改写（如复制时保留时间戳）也能使缓存失效"""
+        import hashlib
+
+        digest = hashlib.blake2b(digest_size=16)
+        for path in sources:
+            try:
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(block)
+            except OSError:
+                digest.update(b"\0missing")
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _load_cache(self, cache_file: str, sources: Tuple[str, ...]) -> bool:
+        """源文件未变化时直接从缓存恢复解析结果，成功返回True"""
+        import pickle
+
+        try:
+            with open(cache_file, "rb") as f:
+                key, data = pickle.load(f)
+        except Exception:
+            # 缓存只是加速手段：文件损坏、版本不兼容或引用了找不到的类都按未命中处理
+            return False
+        if key != self._cache_key(sources) + (self._content_digest(sources),):
+            return False
+        data["vocabulary"] = {
+            category: WordStore(blob=blob, offsets=offsets)
+            for category, (blob, offsets) in data["vocabulary"].items()
+        }
+        for field in _CACHED_FIELDS:
+            setattr(self, field, data[field])
+        return True
+
+    def _save_cache(self, cache_file: str, sources: Tuple[str, ...]):
+        """写入解析缓存（先写临时文件再替换，避免并发读到半个文件）"""
+        import pickle
+
+        # 加载过程可能创建或重写角色池文件，因此在加载之后计算键
+        key = self._cache_key(sources) + (self._content_digest(sources),)
+        data = {field: getattr(self, field) for field in _CACHED_FIELDS}
+        # 只存 (字节串, 偏移数组)，不存类实例：从脚本写入的缓存里类属于 __main__，
+        # 作为模块导入时会找不到
+        data["vocabulary"] = {
+            category: (bytes(store.blob), store.offsets)
+            for category, store in self.vocabulary.items()
+        }
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_file) or ".", mode=0o700, exist_ok=True)
+            with open(tmp_file, "wb") as f:
+                pickle.dump((key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"警告: 无法写入缓存文件 {cache_file}: {e}", file=sys.stderr)
+
+    def _load_vocabulary(self, file_path: str) -> Dict[str, WordStore]:
+        """加载词汇库"""
+        vocab: Dict[str, WordStore] = {}  # 边解析边写入紧凑词表，不经过临时列表
+        current_category = ""
+
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith("## "):
+                        # 假设标题格式是 "## 中文名 英文名 & 其他"
+                        # 提取纯中文名作为字典键
+                        match = re.match(r"##\s*([\u4e00-\u9fa5]+)", line)
+                        if match:
+                            current_category = match.group(1).strip()
+                        else:
+                            # 备用逻辑，尝试获取第一个中文词
+                            current_category = (
+                                line[3:].split("&")[0].split(" ")[0].strip()
+                            )
+                            # 如果实在无法匹配中文，回退到原始处理方式（但可能会带英文）
+                            if not current_category or not re.match(
+                                r"[\u4e00-\u9fa5]+", current_category
+                            ):
+                                current_category = (
+                                    line[3:].split("&")[0].strip()
+                                )  # 原始带英文的
+
+                        vocab[current_category] = WordStore()
+                        self.vocabulary_weights[current_category] = array("d")
+                    elif line.startswith("- ") and current_category:
+                        word, _, annotation = line[2:].partition(" (")
+                        word = word.strip()
+                        if word:
+                            vocab[current_category].append(word)
+                            self.vocabulary_weights[current_category].append(
+                                parse_weight(annotation)
+                            )
+        except FileNotFoundError:
+            print(f"警告: 找不到文件 {file_path}", file=sys.stderr)
+            return {}  # 返回空字典
+        except Exception as e:
+            print(f"加载词汇库时发生错误: {e}", file=sys.stderr)
+            return {}
+        return vocab
+
+    @property
+    def rules_examples(self) -> Dict[str, List[Dict]]:
+        """rules.md 中的示例（可以用于未来验证或提示），首次访问时加载并缓存"""
+        if self._rules_examples is None:
+            self._rules_examples = self._load_rules_examples(self.sources[1])
+        return self._rules_examples
+
+    @property
+    def reference_index(self) -> ReferenceIndex:
+        """规则示例的相似度索引（惰性构建并缓存）"""
+        if self._reference_index is None:
+            self._reference_index = ReferenceIndex(self.rules_examples)
+        return self._reference_index
+
+    def _load_rules_examples(self, file_path: str) -> Dict[str, List[Dict]]:
+        """加载规则示例（当前未直接用于生成，但可用于参考或未来功能）"""
+        examples = {}
+        current_style = ""
+
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith("### 风格"):
+                        heading, _, current_style = line.partition("：")
+                        current_style = current_style.strip()
+                        examples[current_style] = []
+                        # 记下标题中的风格编号，供相似度索引按风格分组
+                        style_number = heading[len("### 风格") :].strip()
+                        style_number = (
+                            int(style_number) if style_number.isdigit() else None
+                        )
+                    elif line.startswith("| ") and current_style and "|" in line:
+                        parts = [p.strip() for p in line.split("|")]
+                        if (
+                            len(parts) >= 3
+                            and parts[1]
+                            and parts[2]
+                            and not parts[1].startswith("原标题")
+                        ):
+                            examples[current_style].append(
+                                {
+                                    "original": parts[1],
+                                    "generated": parts[2],
+                                    "style": style_number,
+                                }
+                            )
+        except FileNotFoundError:
+            print(f"警告: 找不到文件 {file_path}", file=sys.stderr)
+
+        return examples
+
+    def _load_character_pool(self, file_path: str) -> Dict[str, List[str]]:
+        """加载角色名字池"""
+        default_pool = {
+            "动漫角色": [
+                "远坂凛",
+                "saber",
+                "亚丝娜",
+                "楪祈",
+                "御坂美琴",
+                "炮姐",
+                "时崎狂三",
+                "五河琴里",
+                "夜刀神十香",
+                "四糸乃",
+                "八舞耶俱矢",
+                "八舞夕弦",
+                "诱宵美九",
+                "或守鞠亚",
+                "园神凛祢",
+                "非莉娅",
+                "两仪式",
+                "浅上藤乃",
+                "黑桐鲜花",
+                "苍崎青子",
+                "久远寺有珠",
+                "卡莲",
+                "尤菲",
+                "C.C.",
+                "夏莉",
+                "罗伊德",
+                "柯内莉娅",
+            ],
+            "游戏角色": [
+                "希尔薇",
+                "莫妮卡",
+                "星梨花",
+                "艾莉卡",
+                "千早",
+                "亚里沙",
+                "真白",
+                "伊莉雅",
+                "美游",
+                "小黑",
+                "克洛伊",
+                "巴泽特",
+                "斯卡哈",
+                "斯卡蒂",
+                "布伦希尔德",
+                "齐格飞",
+                "齐格鲁德",
+                "源赖光",
+                "酒吞童子",
+                "茨木童子",
+                "玉藻前",
+                "清姬",
+                "阎魔刀",
+            ],
+            "原创角色": [
+                "苏沐沐",
+                "林若曦",
+                "慕容雪",
+                "欧阳娜娜",
+                "上官婉儿",
+                "司马嫣然",
+                "夏雨荷",
+                "魏紫嫣",
+                "秦雨瑶",
+                "唐婉儿",
+                "宋佳音",
+                "许清歌",
+                "韩雪莉",
+                "冯雨晴",
+                "邓紫琪",
+                "曹颖",
+                "萧薰儿",
+                "彩鳞",
+                "云韵",
+                "美杜莎",
+                "雅妃",
+                "纳兰嫣然",
+                "云芝",
+                "小医仙",
+            ],
+            "通用称呼": [
+                "学姐",
+                "学妹",
+                "老师",
+                "护士",
+                "医生",
+                "警察",
+                "空姐",
+                "女仆",
+                "兔女郎",
+                "巫女",
+                "修女",
+                "骑士",
+                "法师",
+                "牧师",
+                "刺客",
+                "弓箭手",
+                "舞娘",
+                "歌姬",
+                "偶像",
+                "主播",
+            ],
+            "自定义角色": [],  # 为用户自定义留空
+        }
+
+        file_stats = None
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                custom_pool = json.load(f)
+                # 保留键 __weights__ 存放角色权重 {角色名: 权重}
+                self.character_weights = {
+                    normalize_character_name(name): float(weight)
+                    for name, weight in custom_pool.pop(WEIGHTS_KEY, {}).items()
+                }
+                self.removed_characters = custom_pool.pop(REMOVED_KEY, {})
+                # 已删除的内置角色不再从默认池合并回来
+                for category, names in self.removed_characters.items():
+                    removed = {character_key(name) for name in names}
+                    if category in default_pool:
+                        default_pool[category] = [
+                            name
+                            for name in default_pool[category]
+                            if character_key(name) not in removed
+                        ]
+                # 先规范化文件内容，统计文件本身的重复项
+                custom_pool, file_stats = normalize_character_pool(custom_pool)
+                # 合并自定义池和默认池
+                for category, characters in custom_pool.items():
+                    if category in default_pool:
+                        # 使用集合进行去重合并，保持原有顺序并添加新的
+                        existing_chars = set(default_pool[category])
+                        for char in characters:
+                            if char not in existing_chars:
+                                default_pool[category].append(char)
+                                existing_chars.add(char)
+                    else:
+                        default_pool[category] = characters  # 添加新分类
+        except FileNotFoundError:
+            # 如果文件不存在，创建默认的角色池文件
+            self._write_json_atomic(file_path, default_pool)
+            print(f"已创建默认角色池文件: {file_path}", file=sys.stderr)
+        except json.JSONDecodeError:
+            # 不覆盖损坏的文件，留给用户检查修复
+            print(
+                f"警告: 角色池文件 {file_path} 格式错误，将使用默认角色池。请检查文件内容。",
+                file=sys.stderr,
+            )
+
+        # 确保所有类别至少是一个空列表，避免KeyError
+        for category in default_pool:
+            if default_pool[category] is None:
+                default_pool[category] = []
+
+        self._replay_character_journal(default_pool, file_path + JOURNAL_SUFFIX)
+        # 合并后再规范化一次，处理默认池与文件之间仅大小写/全半角不同的重复
+        pool, stats = normalize_character_pool(default_pool)
+        if file_stats is not None:
+            for field, count in file_stats.items():
+                stats[field] += count
+        self.character_pool_stats = stats
+        if file_stats is not None and (stats["duplicates"] or stats["normalized"]):
+            # 修正磁盘上的文件，避免重复项在之后的保存中一直保留下来
+            self._write_character_snapshot(file_path, pool)
+            print(
+                f"已规范化角色池文件 {file_path}：移除 {stats['duplicates']} 个重复，"
+                f"改写 {stats['normalized']} 个名字",
+                file=sys.stderr,
+            )
+        return pool
+
+    def _replay_character_journal(self, pool: Dict[str, List[str]], journal_file: str):
+        """
+        把增量日志中的操作依次应用到角色池上。
+        操作是幂等的（已存在则不重复添加，不存在则忽略删除），
+        因此快照写入后、日志清空前崩溃也不会出错；写了一半的行会被跳过。
+        """
+        self._journal_entries = 0
+        try:
+            f = open(journal_file, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        skipped = 0
+        # 每个分类用一个保持插入顺序的字典做索引，每个操作 O(1)，结束后再写回列表
+        index: Dict[str, Dict[str, None]] = {}
+        with f:
+            for line in f:
+                self._journal_entries += 1
+                try:
+                    op = json.loads(line)
+                    kind, category, name = op["op"], op["category"], op["name"]
+                except (ValueError, KeyError, TypeError):
+                    skipped += 1
+                    continue
+                characters = index.get(category)
+                if characters is None:
+                    characters = index[category] = dict.fromkeys(
+                        pool.get(category) or ()
+                    )
+                if kind == "add":
+                    characters.setdefault(name)
+                    self._untombstone(category, name)
+                elif kind == "remove":
+                    characters.pop(name, None)
+                    self._tombstone(category, name)
+        for category, characters in index.items():
+            pool[category] = list(characters)
+        if skipped:
+            print(f"警告: 角色池日志 {journal_file} 中有 {skipped} 行无法解析，已跳过", file=sys.stderr)
+
+    @property
+    def character_sampler(self) -> CharacterSampler:
+        """当前角色池对应的采样器（惰性构建并缓存）"""
+        if self._character_sampler is None:
+            self._character_sampler = CharacterSampler(
+                self.character_pool, self.character_weighting, self.character_weights
+            )
+        return self._character_sampler
+
+    def load_changed(self) -> "AutoTitleGenerator":
+        """源文件有变化时按相同配置加载一个新实例（采样器已预先构建），否则返回None"""
+        if self._cache_key(self._watched_files) == self._source_key:
+            return None
+        fresh = AutoTitleGenerator(
+            *self.sources,
+            character_weighting=self.character_weighting,
+            cache_file=self.cache_file,
+            snapshot_file=self.snapshot_file,
+        )
+        fresh.character_sampler  # 在替换前构建好，避免替换后首次抽取时才构建
+        for style in self.compiled_styles.compiled():  # 预编译正在使用的风格
+            fresh.compiled_styles[style]
+        return fresh
+
+    def swap_from(self, fresh: "AutoTitleGenerator"):
+        """
+        用新实例的词库、角色池及派生结构替换当前内容。
+        一次 dict.update 在持有GIL期间完成，其他线程不会看到新旧字段混杂的中间状态；
+        本实例的随机数生成器保持不变。
+        """
+        state = {field: getattr(fresh, field) for field in _RELOADED_FIELDS}
+        state["_source_key"] = fresh._source_key
+        self.__dict__.update(state)
+
+    def reload(self) -> bool:
+        """源文件有变化时重新加载并替换，返回是否发生了重新加载"""
+        fresh = self.load_changed()
+        if fresh is None:
+            return False
+        self.swap_from(fresh)
+        return True
+
+    def start_auto_reload(
+        self, interval: float = 2.0, schedule=None
+    ) -> "threading.Event":
+        """
+        启动后台线程每 interval 秒检查一次源文件的 mtime/大小，变化时在该线程中
+        完成解析和构建，再整体替换。schedule 用于把替换动作交给其他线程执行
+        （如事件循环的 call_soon_threadsafe），缺省时在后台线程直接替换。
+        返回的 Event 被 set 后线程退出。
+        """
+        import threading
+
+        stop = threading.Event()
+
+        def poll():
+            while not stop.wait(interval):
+                try:
+                    fresh = self.load_changed()
+                except Exception as e:  # 源文件写到一半等情况，保留旧内容，下次再试
+                    print(f"警告: 重新加载失败，继续使用旧内容: {e}", file=sys.stderr)
+                    continue
+                if fresh is None:
+                    continue
+                if schedule is None:
+                    self.swap_from(fresh)
+                else:
+                    schedule(self.swap_from, fresh)
+                print("已重新加载词库和角色池", file=sys.stderr)
+
+        threading.Thread(target=poll, name="title-reload", daemon=True).start()
+        return stop
+
+    def get_random_character(self) -> str:
+        """从角色池中随机选择一个角色"""
+        return self.character_sampler.sample(self.rng)
+
+    def get_random_word(self, category: str, fallback_list: List[str] = None) -> str:
+        """从指定类别获取随机词汇，并支持回退列表"""
+        if fallback_list is None:
+            fallback_list = []  # 默认空列表，防止NoneType错误
+
+        if category in self.vocabulary and self.vocabulary[category]:
+            table = self.word_alias_tables.get(category)
+            if table is not None:
+                return self.vocabulary[category][table.sample(self.rng)]
+            return self.rng.choice(self.vocabulary[category])
+        elif fallback_list:
+            if self.metrics is not None:
+                self.metrics.count_fallback(category, "fallback")
+            return self.rng.choice(fallback_list)
+        if self.metrics is not None:
+            self.metrics.count_fallback(category, "unknown")
+        return UNKNOWN_WORD  # 最终回退
+
+    def _resolve_pool(self, category: str, fallback: List[str]):
+        """按 get_random_word 的回退规则解析出槽位词池及其别名表"""
+        if category and self.vocabulary.get(category):
+            return (
+                self.vocabulary[category],
+                self.word_alias_tables.get(category),
+                "vocabulary",
+            )
+        if fallback:
+            return tuple(fallback), None, "fallback" if category else "list"
+        return (UNKNOWN_WORD,), None, "unknown"
+
+    def _compile_templates(self) -> "CompiledStyles":
+        """返回 STYLE_TEMPLATES 各风格的句式表，每个风格在首次使用时才编译"""
+        return CompiledStyles(STYLE_TEMPLATES, self._resolve_pool)
+
+    def _generate_style(
+        self, style: int, character: str = None, rng: random.Random = None
+    ) -> str:
+        """随机选一个已编译句式并填充，rng 缺省为实例的随机数生成器"""
+        if rng is None:
+            rng = self.rng
+        if character is None:
+            character = self.character_sampler.sample(rng)
+        pattern = rng.choice(self.compiled_styles[style])
+        if self.metrics is None:
+            return pattern.render(character, rng)
+        start = time.perf_counter()
+        title = pattern.render(character, rng)
+        self.metrics.observe(pattern, time.perf_counter() - start)
+        return title
+
+    def _generate_record(self, style: int, character: str) -> TitleRecord:
+        """同 _generate_style（随机数消耗完全一致），另外带上句式和角色分类"""
+        pattern = self.rng.choice(self.compiled_styles[style])
+        if self.metrics is None:
+            title = pattern.render(character, self.rng)
+        else:
+            start = time.perf_counter()
+            title = pattern.render(character, self.rng)
+            self.metrics.observe(pattern, time.perf_counter() - start)
+        return TitleRecord(
+            title,
+            style,
+            pattern.index,
+            character,
+            self.character_sampler.category_of(character),
+        )
+
+    def enable_metrics(self) -> "TitleMetrics":
+        """开启统计（默认关闭，关闭时每个标题只多一次属性判断），返回统计对象"""
+        if self.metrics is None:
+            self.metrics = TitleMetrics()
+        return self.metrics
+
+    def generate_style1(self, character: str = None) -> str:
+        """风格1：神经刀第一人称 - 更加多样化，贴近rules.md示例"""
+        return self._generate_style(1, character)
+
+    def generate_style2(self, character: str = None) -> str:
+        """风格2：机械降神·赛博淫语 - 更多科技感，贴近rules.md示例"""
+        return self._generate_style(2, character)
+
+    def generate_style3(self, character: str = None) -> str:
+        """风格3：古风淫词·淫艳诗词 - 更多古典美，贴近rules.md示例"""
+        return self._generate_style(3, character)
+
+    def generate_style4(self, character: str = None) -> str:
+        """风格4：街头涂鸦·毒液俚语 - 粗犷直接，贴近rules.md示例"""
+        return self._generate_style(4, character)
+
+    def generate_style5(self, character: str = None) -> str:
+        """风格5：深夜电台·喘息ASMR - 破碎、模糊、强调听觉，贴近rules.md示例"""
+        return self._generate_style(5, character)
+
+    def generate_style6(self, character: str = None) -> str:
+        """风格6：新闻报道式 / 调查报告式"""
+        return self._generate_style(6, character)
+
+    def generate_style7(self, character: str = None) -> str:
+        """风格7：Pornhub 风格"""
+        return self._generate_style(7, character)
+
+    def generate(
+        self, style: int = None, character: str = None, count: int = 1
+    ) -> List[str]:
+        """生成指定风格的标题，如果风格为None则随机选择（仅当count=1时推荐）"""
+        # 如果风格为None，则随机选择一个风格（注意：这个选择对整个count批次生效）
+        chosen_style = style if style is not None else self.rng.randint(1, 5)
+
+        if chosen_style not in self.compiled_styles:
+            raise ValueError(
+                f"无效的风格编号，可选：{list(self.compiled_styles.keys())}"
+            )
+
+        return [self._generate_style(chosen_style, character) for _ in range(count)]
+
+    def generate_all_styles(
+        self, character: str = None, count: int = 1
+    ) -> Dict[int, List[str]]:
+        """生成所有风格的标题"""
+        return {style: self.generate(style, character, count) for style in range(1, 6)}
+
+    def generate_random_batch(
+        self,
+        total_count: int,
+        random_style: bool = True,
+        random_character: bool = True,
+        fixed_character_name: str = None,  # 新增参数：指定固定的角色名
+    ) -> List[str]:
+        """
+        生成随机批量的标题。
+        random_style: True则每个标题随机风格，False则所有标题使用一个随机选定的风格。
+        random_character: True则每个标题随机角色，False则所有标题使用一个随机选定的角色。
+        fixed_character_name: 如果指定，则使用此角色名，忽略random_character设置。
+        """
+        return list(
+            self.iter_titles(
+                total_count, random_style, random_character, fixed_character_name
+            )
+        )
+
+    def iter_titles(
+        self,
+        total_count: int,
+        random_style: bool = True,
+        random_character: bool = True,
+        fixed_character_name: str = None,
+        fixed_style: int = None,
+    ) -> Iterator[str]:
+        """
+        逐个产出标题的生成器，参数含义同 generate_random_batch。
+        fixed_style: 如果指定，则所有标题使用此风格，忽略random_style设置。
+        """
+        style_for_batch, char_for_batch, per_title_character = self._batch_plan(
+            random_style, random_character, fixed_character_name, fixed_style
+        )
+        for _ in range(total_count):
+            # 确定当前标题的风格
+            current_style = (
+                self.rng.randint(1, 5) if style_for_batch is None else style_for_batch
+            )
+            # 只有当允许随机角色且没有指定固定角色名时，才每次随机
+            current_character = (
+                self.get_random_character() if per_title_character else char_for_batch
+            )
+            yield self._generate_style(current_style, current_character)
+
+    def iter_records(
+        self,
+        total_count: int,
+        random_style: bool = True,
+        random_character: bool = True,
+        fixed_character_name: str = None,
+        fixed_style: int = None,
+    ) -> Iterator[TitleRecord]:
+        """同 iter_titles（同种子下标题完全一致），产出带元数据的 TitleRecord"""
+        style_for_batch, char_for_batch, per_title_character = self._batch_plan(
+            random_style, random_character, fixed_character_name, fixed_style
+        )
+        for _ in range(total_count):
+            current_style = (
+                self.rng.randint(1, 5) if style_for_batch is None else style_for_batch
+            )
+            current_character = (
+                self.get_random_character() if per_title_character else char_for_batch
+            )
+            yield self._generate_record(current_style, current_character)
+
+    def _batch_plan(
+        self,
+        random_style: bool,
+        random_character: bool,
+        fixed_character_name: str,
+        fixed_style: int,
+    ) -> Tuple[int, str, bool]:
+        """确定整批固定的风格和角色，返回 (固定风格或None, 固定角色或None, 是否每个标题随机角色)"""
+        # 如果random_character为False，且未指定fixed_character_name，则为整个批次选择一个固定角色
+        char_for_batch = None
+        if fixed_character_name:  # 用户明确指定了固定角色名
+            char_for_batch = fixed_character_name
+        elif (
+            not random_character
+        ):  # 用户要求固定角色但未指定名字，则随机选择一个作为固定角色
+            char_for_batch = self.get_random_character()
+        per_title_character = random_character and not fixed_character_name
+
+        # 如果random_style为False，则为整个批次选择一个固定风格
+        style_for_batch = fixed_style
+        if style_for_batch is None and not random_style:
+            style_for_batch = self.rng.randint(1, 5)
+        if style_for_batch is not None and style_for_batch not in self.compiled_styles:
+            raise ValueError(
+                f"无效的风格编号，可选：{list(self.compiled_styles.keys())}"
+            )
+        return style_for_batch, char_for_batch, per_title_character
+
+    def iter_bulk(
+        self,
+        n: int,
+        seed: int = None,
+        style: int = None,
+        character: str = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        records: bool = False,
+    ) -> Iterator[str]:
+        """按块调用 generate_bulk 并逐个产出标题，内存只占一个块"""
+        for size, chunk_seed in self._shard_plan(n, seed, chunk_size):
+            yield from self.generate_bulk(size, chunk_seed, style, character, records)
+
+    def _shard_plan(
+        self, n: int, seed: int, chunk_size: int
+    ) -> List[Tuple[int, int]]:
+        """
+        把 n 切成固定大小的分片，各分片种子由主种子依次派生，保证整体可复现。
+        未指定主种子时从实例的随机数生成器中抽取。
+        """
+        if seed is None:
+            seed = self.rng.getrandbits(64)
+        seeds = random.Random(seed)
+        return [
+            (min(chunk_size, n - start), seeds.getrandbits(64))
+            for start in range(0, n, chunk_size)
+        ]
+
+    def _map_shards(self, tasks: List[Tuple], workers: int) -> Iterator:
+        """用进程池按顺序执行分片任务，每个工作进程持有一份预加载的生成器"""
+        for task in tasks:
+            style = task[2]
+            if style is not None and style not in self.compiled_styles:
+                raise ValueError(
+                    f"无效的风格编号，可选：{list(self.compiled_styles.keys())}"
+                )
+        import collections
+        import multiprocessing
+
+        with multiprocessing.Pool(
+            workers, initializer=_init_shard_worker, initargs=(self,)
+        ) as pool:
+            # 最多 SHARD_WINDOW_FACTOR*workers 个分片在途：消费方慢时不再提交新分片，
+            # 主进程只缓存有限个已完成的分片，流式输出的内存保持平稳
+            window = collections.deque()
+            pending = iter(tasks)
+            for task in itertools.islice(pending, SHARD_WINDOW_FACTOR * workers):
+                window.append(pool.apply_async(_run_shard, (task,)))
+            while window:
+                result = window.popleft().get()
+                for task in itertools.islice(pending, 1):
+                    window.append(pool.apply_async(_run_shard, (task,)))
+                yield result
+
+    def iter_sharded(
+        self,
+        n: int,
+        workers: int,
+        seed: int = None,
+        style: int = None,
+        character: str = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        records: bool = False,
+    ) -> Iterator[str]:
+        """
+        多进程分片生成，按分片顺序合并产出标题（records 为True时产出 TitleRecord）。
+        分片大小和种子只取决于 n/seed/chunk_size，因此输出与 workers 无关，
+        并与同参数的 iter_bulk 完全一致。
+        """
+        tasks = [
+            (size, shard_seed, style, character, None, records)
+            for size, shard_seed in self._shard_plan(n, seed, chunk_size)
+        ]
+        for titles in self._map_shards(tasks, workers):
+            yield from titles
+
+    def write_shards(
+        self,
+        n: int,
+        workers: int,
+        shard_dir: str,
+        seed: int = None,
+        style: int = None,
+        character: str = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> List[str]:
+        """多进程分片生成，各工作进程直接写 shard_dir/shard_00000.txt，返回文件列表"""
+        Path(shard_dir).mkdir(parents=True, exist_ok=True)
+        tasks = []
+        for i, (size, shard_seed) in enumerate(self._shard_plan(n, seed, chunk_size)):
+            path = Path(shard_dir) / f"shard_{i:05d}.txt"
+            tasks.append((size, shard_seed, style, character, str(path), False))
+        return list(self._map_shards(tasks, workers))
+
+    def generate_bulk(
+        self,
+        n: int,
+        seed: int = None,
+        style: int = None,
+        character: str = None,
+        records: bool = False,
+    ) -> List[str]:
+        """
+        大批量生成标题：一次性用 NumPy 抽取全部风格、句式、角色和槽位下标，
+        再按 (风格, 句式) 分组拼接字符串。未安装 NumPy 时退化为逐条生成。
+        style: 为None时每个标题在风格1-5中随机。
+        character: 为None时每个标题随机角色。
+        records: 为True时返回 TitleRecord 列表（标题与默认模式相同）。
+        """
+        if style is not None and style not in self.compiled_styles:
+            raise ValueError(
+                f"无效的风格编号，可选：{list(self.compiled_styles.keys())}"
+            )
+        if seed is None:
+            seed = self.rng.getrandbits(64)
+        if _import_numpy() is None:
+            return self._generate_bulk_python(n, seed, style, character, records)
+
+        rng = np.random.default_rng(seed)
+        styles = (
+            rng.integers(1, 6, size=n) if style is None else np.full(n, style)
+        )
+
+        if character is None:
+            characters = self._sample_characters_numpy(rng, n)
+        else:
+            characters = np.full(n, character, dtype=object)
+
+        titles = [None] * n
+        for current_style in np.unique(styles):
+            patterns = self.compiled_styles[int(current_style)]
+            rows = np.flatnonzero(styles == current_style)
+            pattern_ids = rng.integers(0, len(patterns), size=len(rows))
+            for pattern_id in np.unique(pattern_ids):
+                group = rows[pattern_ids == pattern_id]
+                pattern = patterns[int(pattern_id)]
+                if self.metrics is not None:
+                    self.metrics.observe_bulk(pattern, len(group))
+                columns = []
+                for slot in pattern.slots:
+                    if slot.pool is None:
+                        columns.append(characters[group].tolist())
+                        continue
+                    if slot.alias is not None:
+                        indices = slot.alias.sample_numpy(rng, len(group))
+                    else:
+                        indices = rng.integers(0, len(slot.pool), size=len(group))
+                    if isinstance(slot.pool, tuple):
+                        column = np.array(slot.pool, dtype=object)[indices]
+                    else:
+                        # 紧凑词表只解码被抽中的词，不整体展开
+                        pool = slot.pool
+                        column = np.array(
+                            [pool[i] for i in indices.tolist()], dtype=object
+                        )
+                    if slot.probability < 1.0:
+                        column[rng.random(len(group)) >= slot.probability] = ""
+                    columns.append(column.tolist())
+                fmt = pattern.fmt
+                if records:
+                    category_of = self.character_sampler.category_of
+                    for row, name, values in zip(
+                        group.tolist(), characters[group].tolist(), zip(*columns)
+                    ):
+                        titles[row] = TitleRecord(
+                            fmt.format(*values),
+                            pattern.style,
+                            pattern.index,
+                            name,
+                            category_of(name),
+                        )
+                    continue
+                for row, values in zip(group.tolist(), zip(*columns)):
+                    titles[row] = fmt.format(*values)
+        return titles
+
+    def _sample_characters_numpy(self, rng, n: int):
+        """按采样器的权重模式批量抽取角色，返回 object 数组"""
+        sampler = self.character_sampler
+        if not sampler.total:
+            return np.full(n, DEFAULT_CHARACTER, dtype=object)
+        flat = np.array(sampler.flat, dtype=object)
+        if sampler.mode == "character":
+            if sampler.table is not None:
+                return flat[sampler.table.sample_numpy(rng, n)]
+            return flat[rng.integers(0, sampler.total, size=n)]
+        sizes = np.array(sampler.sizes)
+        starts = np.array(sampler.starts)
+        category_ids = rng.integers(0, sampler.category_count, size=n)
+        offsets = (rng.random(n) * sizes[category_ids]).astype(np.int64)
+        for k, table in enumerate(sampler.category_tables):
+            if table is not None:
+                rows = np.flatnonzero(category_ids == k)
+                offsets[rows] = table.sample_numpy(rng, len(rows))
+        return flat[starts[category_ids] + offsets]
+
+    def _generate_bulk_python(
+        self, n: int, seed: int, style: int, character: str, records: bool = False
+    ) -> List[str]:
+        """generate_bulk 的纯 Python 实现，使用独立的 random.Random"""
+        rng = random.Random(seed)
+        sampler = self.character_sampler
+        titles = []
+        for _ in range(n):
+            current_style = style if style is not None else rng.randint(1, 5)
+            current_character = character
+            if current_character is None:
+                current_character = sampler.sample(rng)
+            pattern = rng.choice(self.compiled_styles[current_style])
+            if self.metrics is None:
+                title = pattern.render(current_character, rng)
+            else:
+                start = time.perf_counter()
+                title = pattern.render(current_character, rng)
+                self.metrics.observe(pattern, time.perf_counter() - start)
+            if records:
+                title = TitleRecord(
+                    title,
+                    current_style,
+                    pattern.index,
+                    current_character,
+                    sampler.category_of(current_character),
+                )
+            titles.append(title)
+        return titles
+
+    def analyze_space(self, batch_size: int = 1, character: str = None) -> Dict:
+        """
+        分析各风格、各句式可生成的标题空间。
+        combinations 为槽位取值组合数（不同取值拼接后恰好相同的情况未扣除，
+        因此是不同标题数的上界）；entropy_bits 为香农熵；
+        expected_duplicate_rate 为 batch_size 个标题中的期望重复比例。
+        character: 指定固定角色时，角色槽位只有一个取值。
+        """
+        char_dist = (
+            {character: 1.0}
+            if character is not None
+            else self.character_sampler.distribution()
+        )
+        char_hist = probability_histogram(char_dist.values())
+
+        report = {"batch_size": batch_size, "styles": {}}
+        style_hists = {}
+        for style, patterns in self.compiled_styles.items():
+            pattern_hists = []
+            pattern_reports = []
+            for pattern in patterns:
+                hist = {1.0: 1}
+                for slot in pattern.slots:
+                    if slot.pool is None:
+                        slot_hist = char_hist
+                    else:
+                        slot_hist = probability_histogram(
+                            slot.distribution().values()
+                        )
+                    hist = combine_histograms(hist, slot_hist)
+                pattern_hists.append(hist)
+                pattern_reports.append(
+                    {
+                        "index": pattern.index,
+                        "template": pattern.template,
+                        **histogram_stats(hist, batch_size),
+                    }
+                )
+            # 句式等概率选取
+            style_hists[style] = mix_histograms(pattern_hists)
+            report["styles"][style] = {
+                **histogram_stats(style_hists[style], batch_size),
+                "patterns": pattern_reports,
+            }
+
+        # 随机风格模式在风格1-5中等概率选取
+        report["random_style"] = histogram_stats(
+            mix_histograms([style_hists[style] for style in range(1, 6)]),
+            batch_size,
+        )
+        return report
+
+    def title_space(self, style: int = None, character: str = None) -> TitleSpace:
+        """
+        指定风格（None 表示风格1-5）全部标题的索引空间，可枚举、按索引取标题
+        或无放回抽样。character 指定时角色槽位固定为该角色。
+        """
+        styles = [style] if style is not None else list(range(1, 6))
+        for current_style in styles:
+            if current_style not in self.compiled_styles:
+                raise ValueError(
+                    f"无效的风格编号，可选：{list(self.compiled_styles.keys())}"
+                )
+        if character is not None:
+            characters = (character,)
+        else:
+            characters = tuple(dict.fromkeys(self.character_sampler.flat)) or (
+                DEFAULT_CHARACTER,
+            )
+        return TitleSpace(
+            [
+                PatternSpace(pattern, characters)
+                for current_style in styles
+                for pattern in self.compiled_styles[current_style]
+            ]
+        )
+
+    def iter_all_titles(
+        self, style: int = None, character: str = None
+    ) -> Iterator[str]:
+        """惰性枚举指定风格能生成的每一个标题"""
+        return iter(self.title_space(style, character))
+
+    def sample_unique(
+        self, k: int, style: int = None, character: str = None
+    ) -> Iterator[str]:
+        """从索引空间无放回抽取 k 个互不相同的标题，无需去重重试"""
+        return self.title_space(style, character).sample(k, self.rng)
+
+    def show_space_analysis(self, batch_size: int = 1, character: str = None):
+        """打印标题空间分析"""
+        report = self.analyze_space(batch_size, character)
+        print(f"\n=== 标题空间分析（批量 {batch_size} 个）===")
+        for style, info in report["styles"].items():
+            print(
+                f"\n风格{style}: 组合数 {info['combinations']:.4g}，"
+                f"熵 {info['entropy_bits']:.2f} bit，"
+                f"期望重复率 {info['expected_duplicate_rate']:.2%}"
+            )
+            for r in info["patterns"]:
+                print(
+                    f"  模式{r['index'] + 1}: 组合数 {r['combinations']:.4g}，"
+                    f"熵 {r['entropy_bits']:.2f} bit"
+                )
+        info = report["random_style"]
+        print(
+            f"\n随机风格(1-5): 组合数 {info['combinations']:.4g}，"
+            f"熵 {info['entropy_bits']:.2f} bit，"
+            f"期望重复率 {info['expected_duplicate_rate']:.2%}"
+        )
+
+    def add_character(self, category: str, character: str):
+        """添加新角色到池子"""
+        character = normalize_character_name(character)
+        # 检查角色是否已存在（按规范化后的键比较），避免重复添加
+        if self.add_characters([(category, character)]):
+            print(f"已添加角色 '{character}' 到分类 '{category}'")
+        else:
+            print(f"角色 '{character}' 已存在于分类 '{category}' 中，无需重复添加。")
+
+    def add_characters(
+        self, entries: Iterable[Tuple[str, str]], unique_across_categories: bool = False
+    ) -> int:
+        """
+        批量添加 (分类, 角色名)，entries 可以是流式迭代器；只提交一次，返回新增数量。
+        unique_across_categories: 为True时角色名在所有分类中唯一，已存在的角色被跳过。
+        """
+        self._check_writable()
+        # 一次性建立哈希索引，之后每条记录的查重都是 O(1)
+        index = set()
+        for category, characters in self.character_pool.items():
+            keys = (character.casefold() for character in characters)
+            if not unique_across_categories:
+                keys = zip(itertools.repeat(category), keys)
+            index.update(keys)
+        ops = []
+        for category, character in entries:
+            character = normalize_character_name(character)
+            if not character:
+                continue
+            key = character.casefold()
+            if not unique_across_categories:
+                key = (category, key)
+            if key not in index:
+                index.add(key)
+                self.character_pool.setdefault(category, []).append(character)
+                self._untombstone(category, character)
+                ops.append(("add", category, character))
+        if ops:
+            self._character_sampler = None
+            self._append_character_journal(ops)
+        return len(ops)
+
+    def remove_character(self, category: str, character: str) -> bool:
+        """从池子中删除角色，返回是否删除成功"""
+        self._check_writable()
+        characters = self.character_pool.get(category, [])
+        key = character_key(character)
+        matches = [name for name in characters if name.casefold() == key]
+        if not matches:
+            print(f"角色 '{character}' 不在分类 '{category}' 中")
+            return False
+        character = matches[0]
+        characters.remove(character)
+        self._tombstone(category, character)
+        self._character_sampler = None
+        print(f"已从分类 '{category}' 删除角色 '{character}'")
+        self._append_character_journal([("remove", category, character)])
+        return True
+
+    def _tombstone(self, category: str, character: str):
+        """记录删除，使快照合并内置默认角色池时不会把该角色加回来"""
+        names = self.removed_characters.setdefault(category, [])
+        key = character_key(character)
+        if all(character_key(name) != key for name in names):
+            names.append(character)
+
+    def _untombstone(self, category: str, character: str):
+        """重新添加的角色不再视为已删除（与删除记录按 character_key 比较）"""
+        names = self.removed_characters.get(category)
+        if not names:
+            return
+        key = character_key(character)
+        names[:] = [name for name in names if character_key(name) != key]
+        if not names:
+            del self.removed_characters[category]
+
+    def _check_writable(self):
+        """快照加载的角色池是只读映射，修改前检查"""
+        if self.snapshot_file:
+            raise ValueError("从快照加载的角色池是只读的，请修改源文件后重新构建快照")
+
+    def _append_character_journal(self, ops: List[Tuple[str, str, str]]):
+        """
+        把 (操作, 分类, 角色名) 追加到角色池日志并落盘，I/O 只与新增条目数有关；
+        条目累计超过 JOURNAL_COMPACT_THRESHOLD 时合并回快照。
+        """
+        if self._journal_entries is None:
+            try:
+                with open(self.character_journal_file, "rb") as f:
+                    self._journal_entries = sum(1 for _ in f)
+            except FileNotFoundError:
+                self._journal_entries = 0
+        if self._journal_entries + len(ops) > JOURNAL_COMPACT_THRESHOLD:
+            # 追加后也要立即合并，直接写快照（内存中的角色池已包含这些操作）
+            self.compact_character_pool()
+            return
+        lines = [
+            json.dumps(
+                {"op": op, "category": category, "name": name}, ensure_ascii=False
+            )
+            + "\n"
+            for op, category, name in ops
+        ]
+        with open(self.character_journal_file, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_entries += len(ops)
+
+    def compact_character_pool(self):
+        """把当前角色池写成新快照并清空日志"""
+        self._check_writable()
+        self._save_character_pool()
+        try:
+            os.remove(self.character_journal_file)
+        except FileNotFoundError:
+            pass
+        self._journal_entries = 0
+
+    @staticmethod
+    def _write_json_atomic(file_path: str, data):
+        """先写临时文件再替换，崩溃时原文件保持完整"""
+        tmp_file = f"{file_path}.{os.getpid()}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, file_path)
+
+    def _save_character_pool(self, file_path: str = None):
+        """规范化并保存角色池快照到文件（默认为加载时的角色池文件）"""
+        self.character_pool, _ = normalize_character_pool(self.character_pool)
+        self._character_sampler = None
+        self._write_character_snapshot(
+            file_path or self.character_pool_file, self.character_pool
+        )
+
+    def _write_character_snapshot(self, file_path: str, pool: Dict[str, List[str]]):
+        """把角色池连同权重保留键写入快照文件"""
+        data = dict(pool)
+        if self.character_weights:
+            data[WEIGHTS_KEY] = self.character_weights
+        if self.removed_characters:
+            data[REMOVED_KEY] = self.removed_characters
+        self._write_json_atomic(file_path, data)
+
+    def show_character_pool(self, show_stats: bool = False):
+        """显示角色池统计，show_stats 为True时附加加载时规范化/去重的结果"""
+        print("\n=== 角色池统计 ===")
+        for category, characters in self.character_pool.items():
+            print(f"{category}: {len(characters)} 个角色")
+            if len(characters) > 0:
+                print(f"  示例: {', '.join(characters[:5])}")
+        if show_stats:
+            stats = self.character_pool_stats
+            print("\n=== 加载时规范化 ===")
+            print(f"总角色数: {sum(len(c) for c in self.character_pool.values())}")
+            print(f"移除重复: {stats['duplicates']}")
+            print(f"改写名字: {stats['normalized']}")
+            print(f"丢弃空名: {stats['empty']}")
+
+
+EXACT_DEDUP_LIMIT = 1_000_000  # 批量不超过该数量时用精确集合去重，否则用布隆过滤器
+
+
+class ExactDeduper:
+    """基于集合的精确去重，内存随标题数量线性增长"""
+
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, title: str) -> bool:
+        """记录标题，首次出现返回True"""
+        if title in self._seen:
+            return False
+        self._seen.add(title)
+        return True
+
+    @property
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._seen)
+
+
+class BloomFilter:
+    """
+    布隆过滤器：按预期容量和误判率定长分配位数组，内存与实际插入量无关。
+    误判会把少量新标题当成重复（由重试兜底），不会放过真正的重复。
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if not 0 < error_rate < 1:
+            raise ValueError("误判率必须在 (0, 1) 之间")
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_count = max(
+            8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        )
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self._bits = bytearray((self.bit_count + 7) // 8)
+        import hashlib
+
+        self._blake2b = hashlib.blake2b
+
+    def _positions(self, title: str) -> Iterator[int]:
+        digest = self._blake2b(title.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.bit_count
+
+    def add(self, title: str) -> bool:
+        """记录标题，（很可能）首次出现返回True"""
+        bits = self._bits
+        new = False
+        for pos in self._positions(title):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        return new
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+
+def make_deduper(
+    expected: int,
+    error_rate: float = 0.001,
+    exact_limit: int = EXACT_DEDUP_LIMIT,
+):
+    """小批量用精确集合，超过 exact_limit 时改用布隆过滤器"""
+    if expected <= exact_limit:
+        return ExactDeduper()
+    return BloomFilter(expected, error_rate)
+
+
+MINHASH_PRIME = (1 << 31) - 1  # 哈希排列取模用的梅森素数，乘积不超出 64 位
+MINHASH_PERMUTATIONS = 64  # 签名长度上限，实际使用 bands*rows 个
+
+
+@functools.lru_cache(maxsize=None)
+def lsh_bands(threshold: float, num_perm: int = MINHASH_PERMUTATIONS) -> Tuple[int, int]:
+    """
+    选出 bands*rows<=num_perm 的分段方式，使 S 曲线在阈值两侧的误判面积之和最小：
+    阈值以下被判为相似（误拒）与阈值以上未被判为相似（漏判）的概率积分
+    """
+    steps = 100
+
+    def area(lo: float, hi: float, bands: int, rows: int, above: bool) -> float:
+        width = (hi - lo) / steps
+        total = 0.0
+        for i in range(steps):
+            s = lo + (i + 0.5) * width
+            p = 1 - (1 - s**rows) ** bands
+            total += (1 - p if above else p) * width
+        return total
+
+    return min(
+        (
+            (bands, rows)
+            for rows in range(1, num_perm + 1)
+            for bands in range(1, num_perm // rows + 1)
+        ),
+        key=lambda br: area(0, threshold, *br, False) + area(threshold, 1, *br, True),
+    )
+
+
+class MinHashLSH:
+    """
+    近似重复过滤：把标题切成字符 n-gram，计算 MinHash 签名并分段（LSH band），
+    任意一段与已接受标题相同即视为近似重复。Jaccard 相似度高于 threshold 的
+    标题大概率被拒绝、低于的大概率被接受（概率按 S 曲线过渡）。
+    每个标题的开销与已接受数量无关；索引只保存各段的哈希，每个标题 bands 项。
+    与 ExactDeduper/BloomFilter 接口相同，可直接交给 iter_unique 重试。
+    """
+
+    def __init__(self, threshold: float = 0.7, ngram: int = 2, seed: int = 1):
+        if not 0 < threshold < 1:
+            raise ValueError("相似度阈值必须在 (0, 1) 之间")
+        if ngram < 1:
+            raise ValueError("n-gram 长度必须为正整数")
+        self.threshold = threshold
+        self.ngram = ngram
+        self.bands, self.rows = lsh_bands(threshold)
+        # 固定种子的哈希排列，保证同样的输入在任何进程中得到同样的签名
+        rng = random.Random(seed)
+        size = self.bands * self.rows
+        self._a = [rng.randrange(1, MINHASH_PRIME) for _ in range(size)]
+        self._b = [rng.randrange(0, MINHASH_PRIME) for _ in range(size)]
+        self._np_ab = None
+        self._buckets = set()
+        import zlib
+
+        self._crc32 = zlib.crc32
+
+    def shingles(self, title: str) -> List[int]:
+        """标题的字符 n-gram 哈希（crc32，跨进程稳定），不足 n 个字符时取整个标题"""
+        n = self.ngram
+        grams = {title[i : i + n] for i in range(max(len(title) - n + 1, 1))}
+        crc32 = self._crc32
+        return [crc32(gram.encode("utf-8")) for gram in grams]
+
+    def signature(self, title: str) -> List[int]:
+        """MinHash 签名：每个哈希排列下 n-gram 哈希的最小值"""
+        hashes = self.shingles(title)
+        if _import_numpy() is not None:
+            if self._np_ab is None:
+                self._np_ab = (
+                    np.array(self._a, dtype=np.uint64)[:, None],
+                    np.array(self._b, dtype=np.uint64)[:, None],
+                )
+            a, b = self._np_ab
+            values = (a * np.array(hashes, dtype=np.uint64) + b) % MINHASH_PRIME
+            return values.min(axis=1).tolist()
+        return [
+            min((a * h + b) % MINHASH_PRIME for h in hashes)
+            for a, b in zip(self._a, self._b)
+        ]
+
+    def _band_keys(self, title: str) -> List[int]:
+        signature = self.signature(title)
+        rows = self.rows
+        return [
+            hash((band, *signature[band * rows : (band + 1) * rows]))
+            for band in range(self.bands)
+        ]
+
+    def add(self, title: str) -> bool:
+        """与已接受标题都不近似时记录并返回True，否则返回False"""
+        keys = self._band_keys(title)
+        buckets = self._buckets
+        if any(key in buckets for key in keys):
+            return False
+        buckets.update(keys)
+        return True
+
+    @property
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self._buckets) + 32 * len(self._buckets)
+
+
+class DedupStats:
+    """去重统计：生成总数、重复数、放弃数"""
+
+    def __init__(self, deduper=None):
+        self.deduper = deduper
+        self.generated = 0
+        self.duplicates = 0
+        self.accepted = 0
+        self.gave_up = 0
+
+    @property
+    def duplicate_rate(self) -> float:
+        return self.duplicates / self.generated if self.generated else 0.0
+
+    def report(self) -> str:
+        text = (
+            f"去重：生成 {self.generated} 个，重复 {self.duplicates} 个"
+            f"（重复率 {self.duplicate_rate:.2%}），保留 {self.accepted} 个，"
+            f"重试耗尽放弃 {self.gave_up} 个"
+        )
+        if self.deduper is not None:
+            text += (
+                f"；去重结构 {type(self.deduper).__name__}"
+                f" 占用约 {self.deduper.memory_bytes / 1024 / 1024:.1f} MB"
+            )
+        return text
+
+
+def iter_unique(
+    source: Iterator[str],
+    total: int,
+    deduper,
+    max_retries: int = 100,
+    stats: DedupStats = None,
+    key=None,
+) -> Iterator[str]:
+    """
+    从 source 中取出 total 个不重复的标题。
+    每个位置遇到重复时最多重试 max_retries 次，仍重复则放弃该位置。
+    key: 从元素中取出标题的函数（如元素为 TitleRecord 时），缺省为元素本身。
+    """
+    if stats is None:
+        stats = DedupStats(deduper)
+    for _ in range(total):
+        for _ in range(max_retries + 1):
+            title = next(source, None)
+            if title is None:
+                return
+            stats.generated += 1
+            if deduper.add(title if key is None else key(title)):
+                stats.accepted += 1
+                yield title
+                break
+            stats.duplicates += 1
+        else:
+            stats.gave_up += 1
+
+
+SIMILARITY_BUCKETS = 10  # 相似度报告的分布区间数
+
+
+class SimilarityStats:
+    """相似度评分统计：数量、均值、最值、分布及按区间保留的数量"""
+
+    def __init__(self, min_similarity: float = 0.0, max_similarity: float = 1.0):
+        self.min_similarity = min_similarity
+        self.max_similarity = max_similarity
+        self.scored = 0
+        self.kept = 0
+        self.total = 0.0
+        self.lowest = 1.0
+        self.highest = 0.0
+        self.histogram = [0] * SIMILARITY_BUCKETS
+
+    def observe(self, score: float, kept: bool):
+        self.scored += 1
+        self.kept += kept
+        self.total += score
+        self.lowest = min(self.lowest, score)
+        self.highest = max(self.highest, score)
+        self.histogram[min(int(score * SIMILARITY_BUCKETS), SIMILARITY_BUCKETS - 1)] += 1
+
+    def report(self) -> str:
+        if not self.scored:
+            return "相似度：没有评分任何标题"
+        lines = [
+            f"相似度：评分 {self.scored} 个，平均 {self.total / self.scored:.3f}，"
+            f"最低 {self.lowest:.3f}，最高 {self.highest:.3f}；"
+            f"区间 [{self.min_similarity}, {self.max_similarity}] 内保留 {self.kept} 个"
+        ]
+        width = 1 / SIMILARITY_BUCKETS
+        for i, count in enumerate(self.histogram):
+            if count:
+                lines.append(
+                    f"  {i * width:.1f}-{(i + 1) * width:.1f}: {count}"
+                    f" ({count / self.scored:.2%})"
+                )
+        return "\n".join(lines)
+
+
+def iter_similarity_filtered(
+    source: Iterable[str], score, stats: SimilarityStats = None
+) -> Iterator[str]:
+    """
+    按与参考示例的相似度过滤，只产出落在 stats 区间内的元素。
+    score: 元素 -> 相似度的函数，如 lambda title: index.score(title, style)。
+    """
+    if stats is None:
+        stats = SimilarityStats()
+    lo, hi = stats.min_similarity, stats.max_similarity
+    for item in source:
+        value = score(item)
+        kept = lo <= value <= hi
+        stats.observe(value, kept)
+        if kept:
+            yield item
+
+
+_worker_generator = None  # 工作进程内预加载的生成器
+
+
+def _init_shard_worker(generator: "AutoTitleGenerator"):
+    """进程池初始化：保存主进程传来的生成器"""
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _run_shard(task: Tuple):
+    """在工作进程中生成一个分片；指定路径时写入分片文件并返回路径，否则返回标题列表"""
+    size, seed, style, character, path, records = task
+    titles = _worker_generator.generate_bulk(size, seed, style, character, records)
+    if path is None:
+        return titles
+    with open(path, "w", encoding="utf-8", buffering=STREAM_BUFFER_SIZE) as f:
+        f.writelines(f"{title}\n" for title in titles)
+    return path
+
+
+def iter_character_records(
+    path: str,
+    file_format: str = "auto",
+    default_category: str = DEFAULT_IMPORT_CATEGORY,
+) -> Iterator[Tuple[str, str]]:
+    """
+    逐行解析角色文件，产出 (分类, 角色名)，不把整个文件读入内存。
+    csv: 「分类,角色名」两列或只有角色名一列，首行为 category/name 表头时跳过；
+    jsonl: 每行 {"category": ..., "name": ...} 或一个字符串；
+    text: 每行「分类名<TAB>角色名」，没有制表符时整行是角色名。
+    auto 按扩展名判断，.csv/.jsonl/.ndjson 以外按 text 处理。
+    """
+    if file_format == "auto":
+        suffix = Path(path).suffix.lower()
+        file_format = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(
+            suffix, "text"
+        )
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if file_format == "csv":
+            import csv
+
+            for row in csv.reader(f):
+                row = [cell.strip() for cell in row]
+                header = [cell.lower() for cell in row[:2]]
+                if header in (["category", "name"], ["name"]):
+                    continue
+                if len(row) >= 2 and row[1]:
+                    yield (row[0] or default_category), row[1]
+                elif row and row[0]:
+                    yield default_category, row[0]
+        elif file_format == "jsonl":
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"警告: {path} 第 {line_no} 行不是有效的JSON，已跳过", file=sys.stderr)
+                    continue
+                if isinstance(record, str):
+                    name, category = record, default_category
+                elif isinstance(record, dict):
+                    name = record.get("name")
+                    category = record.get("category") or default_category
+                else:
+                    name = category = None
+                if not isinstance(name, str) or not isinstance(category, str):
+                    print(f"警告: {path} 第 {line_no} 行不是有效的角色记录，已跳过", file=sys.stderr)
+                    continue
+                if name:
+                    yield category, name.strip()
+        else:
+            # 分类与角色名用制表符分隔：角色名本身可以含空格（如 Jeanne d'Arc）
+            for line in f:
+                category, tab, name = line.rstrip("\r\n").partition("\t")
+                if not tab:
+                    category, name = default_category, category
+                name = name.strip()
+                if name:
+                    yield category.strip() or default_category, name
+
+
+COMPRESS_CODECS = ("gzip", "bz2", "xz")
+COMPRESS_CHUNK_SIZE = 8 << 20  # 每个独立压缩成员约包含的未压缩字节数
+COMPRESS_QUEUE_SIZE = 2  # 等待压缩的块数上限，生成快于压缩时让生成方等待
+
+
+def _compressor(codec: str):
+    """返回把一块数据压缩成一个完整成员（gzip member / bz2、xz stream）的函数"""
+    if codec == "gzip":
+        import gzip
+
+        # 固定 mtime 使同样的输入得到同样的文件
+        return functools.partial(gzip.compress, compresslevel=6, mtime=0)
+    if codec == "bz2":
+        import bz2
+
+        return bz2.compress
+    if codec == "xz":
+        import lzma
+
+        return lzma.compress
+    raise ValueError(f"无效的压缩格式，可选：{list(COMPRESS_CODECS)}")
+
+
+class CompressedWriter(io.RawIOBase):
+    """
+    分块压缩写出：数据攒够 chunk_size 后在最后一个换行处切开，交给后台线程
+    压缩成一个独立成员并写入 target，生成方同时继续产出下一块。
+    各成员首尾相接即为合法的多成员 gzip/bz2/xz 文件，gzip -dc、xz -dc 及
+    Python 的 gzip/bz2/lzma 模块都能整体解压；每个成员只含完整的行，
+    下游也可以按成员边界切开并行解压。
+    """
+
+    def __init__(
+        self,
+        target,
+        codec: str = "gzip",
+        chunk_size: int = COMPRESS_CHUNK_SIZE,
+    ):
+        self._target = target
+        self._compress = _compressor(codec)
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._members = 0
+        self._error = None
+        import queue
+        import threading
+
+        self._queue = queue.Queue(COMPRESS_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._raise_error()
+        self._buffer += data
+        if len(self._buffer) >= self._chunk_size:
+            cut = self._buffer.rfind(b"\n") + 1 or len(self._buffer)
+            self._submit(bytes(self._buffer[:cut]))
+            del self._buffer[:cut]
+        return len(data)
+
+    def _submit(self, chunk: bytes):
+        self._members += 1
+        self._queue.put(chunk)
+
+    def _run(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if self._error is not None:
+                continue  # 出错后只清空队列，不让生成方阻塞
+            try:
+                self._target.write(self._compress(chunk))
+            except BaseException as e:
+                self._error = e
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            # 没有任何输出时也写一个空成员，使结果仍是合法的压缩文件
+            if self._buffer or not self._members:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            self._queue.put(None)
+            self._thread.join()
+            self._raise_error()
+        finally:
+            super().close()
+            self._target.close()
+
+
+def _open_text_output(
+    output: str = None, newline: str = None, compress: str = None
+):
+    """
+    打开带大缓冲的文本输出，output 为None时包装标准输出（不随之关闭）。
+    compress 为 COMPRESS_CODECS 之一时经 CompressedWriter 在后台线程分块压缩。
+    """
+    if compress:
+        if output:
+            target = open(output, "wb")
+        else:
+            target = open(sys.stdout.fileno(), "wb", closefd=False)
+        return io.TextIOWrapper(
+            io.BufferedWriter(CompressedWriter(target, compress), STREAM_BUFFER_SIZE),
+            encoding="utf-8",
+            newline=newline,
+        )
+    if output:
+        return open(
+            output,
+            "w",
+            encoding="utf-8",
+            buffering=STREAM_BUFFER_SIZE,
+            newline=newline,
+        )
+    return open(
+        sys.stdout.fileno(),
+        "w",
+        encoding="utf-8",
+        buffering=STREAM_BUFFER_SIZE,
+        newline=newline,
+        closefd=False,
+    )
+
+
+def stream_titles(
+    titles: Iterable[str], output: str = None, compress: str = None
+) -> int:
+    """
+    边生成边写出标题（每行一个，不带序号），返回写出的数量。
+    output 为None时写到标准输出；下游管道提前关闭（如 | head）时静默停止。
+    compress: gzip/bz2/xz 时分块压缩写出。
+    """
+    f = _open_text_output(output, compress=compress)
+    written = 0
+    try:
+        with f:
+            for title in titles:
+                f.write(f"{title}\n")
+                written += 1
+    except BrokenPipeError:
+        # 参考 Python 文档：把标准输出重定向到 devnull，避免退出时再次报错
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    return written
+
+
+OUTPUT_FORMATS = ("text", "jsonl", "csv", "parquet", "arrow")
+RECORD_FIELDS = TitleRecord._fields + ("seed", "sequence")  # 结构化输出的列
+RECORD_CHUNK_SIZE = 65_536  # 结构化输出每次批量写出的行数（Parquet 的行组大小）
+
+
+def _record_chunks(records: Iterable[TitleRecord], chunk_size: int):
+    """把记录流切成列表块"""
+    records = iter(records)
+    return iter(lambda: list(itertools.islice(records, chunk_size)), [])
+
+
+def write_records(
+    records: Iterable[TitleRecord],
+    output: str = None,
+    file_format: str = "jsonl",
+    seed: int = None,
+    chunk_size: int = RECORD_CHUNK_SIZE,
+    compress: str = None,
+) -> int:
+    """
+    按块写出带元数据的标题，列见 RECORD_FIELDS（seed 为主种子，sequence 从1开始），
+    返回写出的行数。jsonl/csv 流式写文本（可用 compress 分块压缩），
+    output 为None时写到标准输出；
+    parquet/arrow 需要 pyarrow，每块写成一个行组/记录批次，output 必须是文件。
+    """
+    if file_format in ("parquet", "arrow"):
+        return _write_records_arrow(records, output, file_format, seed, chunk_size)
+    if file_format not in ("jsonl", "csv"):
+        raise ValueError(f"无效的输出格式，可选：{list(OUTPUT_FORMATS[1:])}")
+    f = _open_text_output(
+        output, newline="" if file_format == "csv" else None, compress=compress
+    )
+    written = 0
+    try:
+        with f:
+            if file_format == "csv":
+                import csv
+
+                writer = csv.writer(f)
+                writer.writerow(RECORD_FIELDS)
+            else:
+                # 只有字符串列需要转义，其余列直接拼接，比逐行 json.dumps(dict) 快数倍
+                encode = json.JSONEncoder(ensure_ascii=False).encode
+                tail = f', "seed": {encode(seed)}, "sequence": '
+            for chunk in _record_chunks(records, chunk_size):
+                if file_format == "csv":
+                    writer.writerows(
+                        (*record, seed, sequence)
+                        for sequence, record in enumerate(chunk, written + 1)
+                    )
+                else:
+                    f.write(
+                        "".join(
+                            f'{{"title": {encode(title)}, "style": {style}, '
+                            f'"pattern_id": {pattern_id}, "character": {encode(character)}, '
+                            f'"category": {encode(category)}{tail}{sequence}}}\n'
+                            for sequence, (
+                                title,
+                                style,
+                                pattern_id,
+                                character,
+                                category,
+                            ) in enumerate(chunk, written + 1)
+                        )
+                    )
+                written += len(chunk)
+    except BrokenPipeError:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    return written
+
+
+def _write_records_arrow(
+    records: Iterable[TitleRecord],
+    output: str,
+    file_format: str,
+    seed: int,
+    chunk_size: int,
+) -> int:
+    """用 pyarrow 按列写 Parquet 或 Arrow IPC 文件"""
+    if _import_pyarrow() is None:
+        raise ImportError(f"{file_format} 格式需要安装 pyarrow")
+    if not output:
+        raise ValueError(f"{file_format} 格式必须指定输出文件")
+    schema = pa.schema(
+        [
+            ("title", pa.string()),
+            ("style", pa.int8()),
+            ("pattern_id", pa.int32()),
+            ("character", pa.string()),
+            ("category", pa.string()),
+            ("seed", pa.int64()),
+            ("sequence", pa.int64()),
+        ]
+    )
+    if file_format == "parquet":
+        writer = pa.parquet.ParquetWriter(output, schema)
+    else:
+        writer = pa.ipc.new_file(output, schema)
+    written = 0
+    with writer:
+        for chunk in _record_chunks(records, chunk_size):
+            columns = [list(column) for column in zip(*chunk)]
+            columns.append([seed] * len(chunk))
+            columns.append(range(written + 1, written + len(chunk) + 1))
+            writer.write_table(pa.table(columns, schema=schema))
+            written += len(chunk)
+    return written
+
+
+def _batch_title_iter(
+    generator: "AutoTitleGenerator", args, total: int, records: bool = False
+):
+    """
+    按命令行参数构造批量标题迭代器，返回 (迭代器, 需要在结束时输出的统计列表)。
+    records 为True时迭代器产出 TitleRecord。
+    """
+    fixed_character = args.character
+    if fixed_character is None and args.fixed_char:
+        fixed_character = generator.get_random_character()
+    # 去重时每个位置最多消耗 max_retries+1 个候选
+    dedup = args.unique or args.diversity is not None
+    filtering = args.min_similarity is not None or args.max_similarity is not None
+    source_total = total * (args.max_retries + 1) if dedup or filtering else total
+    # 相似度要与标题自身风格的示例比较，因此评分时内部总是生成带风格的记录，
+    # 纯文本输出最后再取出标题（同种子下标题与直接生成文本完全一致）
+    scoring = filtering or args.similarity_report
+    text_output = not records
+    records = records or scoring
+
+    # 显式指定 --workers（含1）时总走分片路径，保证输出与进程数无关
+    if args.bulk or args.workers is not None:
+        style = args.style
+        if style is None and args.fixed_style:
+            style = generator.rng.randint(1, 5)
+        if args.workers is not None and args.workers > 1:
+            title_iter = generator.iter_sharded(
+                source_total,
+                args.workers,
+                seed=args.seed,
+                style=style,
+                character=fixed_character,
+                records=records,
+            )
+        else:
+            title_iter = generator.iter_bulk(
+                source_total,
+                seed=args.seed,
+                style=style,
+                character=fixed_character,
+                records=records,
+            )
+    else:
+        iter_batch = generator.iter_records if records else generator.iter_titles
+        title_iter = iter_batch(
+            source_total,
+            random_style=not args.fixed_style,
+            fixed_character_name=fixed_character,
+            fixed_style=args.style,
+        )
+
+    reports = []
+    if scoring:
+        # 先按相似度过滤，再对保留的标题去重
+        similarity_stats = SimilarityStats(
+            0.0 if args.min_similarity is None else args.min_similarity,
+            1.0 if args.max_similarity is None else args.max_similarity,
+        )
+        index = generator.reference_index
+        title_iter = iter_similarity_filtered(
+            title_iter,
+            lambda record: index.score(record.title, record.style),
+            similarity_stats,
+        )
+        reports.append(similarity_stats)
+    if dedup:
+        if args.diversity is not None:
+            # 近似去重也会拒绝完全相同的标题，因此不再叠加精确去重
+            deduper = MinHashLSH(args.diversity, args.diversity_ngram)
+        else:
+            deduper = make_deduper(total, args.bloom_error_rate, args.exact_limit)
+        stats = DedupStats(deduper)
+        reports.append(stats)
+        key = (lambda record: record.title) if records else None
+        title_iter = iter_unique(
+            title_iter, total, deduper, args.max_retries, stats, key
+        )
+    elif filtering:
+        title_iter = itertools.islice(title_iter, total)
+    if records and text_output:
+        title_iter = (record.title for record in title_iter)
+    return title_iter, reports
+
+
+BENCH_BASE_WORDS = 100  # 基准规模下每个词汇类别的词数
+BENCH_BASE_CHARACTERS = 50  # 基准规模下每个角色分类的角色数
+BENCH_RULE_EXAMPLES = 20  # 基准规模下每个风格的规则示例数
+
+
+def write_synthetic_sources(directory: str, scale: int) -> Tuple[str, str, str]:
+    """在 directory 下生成按 scale 放大的 name.md、rules.md、characters.json，返回三个路径"""
+    categories = []
+    for table in STYLE_TEMPLATES.values():
+        for template in table["patterns"]:
+            for match in _SLOT_RE.finditer(template):
+                category = match.group(1).partition(":")[0].partition("?")[0]
+                if category and category != "character" and not category.startswith("#"):
+                    categories.append(category)
+    name_file = os.path.join(directory, "name.md")
+    with open(name_file, "w", encoding="utf-8") as f:
+        for category in dict.fromkeys(categories):
+            f.write(f"## {category}\n")
+            for i in range(BENCH_BASE_WORDS * scale):
+                # 每7个词带一个权重注释，让别名表也参与测量
+                weight = " (权重: 2)" if i % 7 == 0 else ""
+                f.write(f"- {category[:2]}{i}{weight}\n")
+    rules_file = os.path.join(directory, "rules.md")
+    with open(rules_file, "w", encoding="utf-8") as f:
+        for style in STYLE_TEMPLATES:
+            f.write(f"### 风格{style}：合成风格{style}\n| 原标题 | 生成标题 |\n")
+            for i in range(BENCH_RULE_EXAMPLES * scale):
+                f.write(f"| 原标题{style}-{i} | 示例标题{style}-{i} |\n")
+    character_pool_file = os.path.join(directory, "characters.json")
+    pool = {
+        f"合成分类{c}": [f"角色{c}-{i}" for i in range(BENCH_BASE_CHARACTERS * scale)]
+        for c in range(5)
+    }
+    with open(character_pool_file, "w", encoding="utf-8") as f:
+        json.dump(pool, f, ensure_ascii=False)
+    return name_file, rules_file, character_pool_file
+
+
+def _titles_per_second(produce, count: int) -> float:
+    """调用 produce() count 次，返回每秒标题数"""
+    start = time.perf_counter()
+    for _ in range(count):
+        produce()
+    return count / (time.perf_counter() - start)
+
+
+def run_benchmark(scales: List[int], titles: int = 20_000, seed: int = 0) -> Dict:
+    """
+    按各个规模生成合成词库与角色池，测量加载、启动、内存和各风格生成速度。
+    返回可直接 json.dump 的结果，便于在版本之间比较。
+    """
+    import platform
+    import tempfile
+    import tracemalloc
+
+    results = []
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as directory:
+            sources = write_synthetic_sources(directory, scale)
+            cache_file = os.path.join(directory, "bench.cache")
+            snapshot_file = os.path.join(directory, "bench.snap")
+
+            start = time.perf_counter()
+            generator = AutoTitleGenerator(*sources, cache_file=None, seed=seed)
+            startup = time.perf_counter() - start
+            # tracemalloc 会拖慢分配，单独构建一次来测量实例内存
+            tracemalloc.start()
+            measured = AutoTitleGenerator(*sources, cache_file=None)
+            memory, memory_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del measured
+
+            loaders = {}
+            for loader, path in zip(
+                ("_load_vocabulary", "_load_rules_examples", "_load_character_pool"),
+                sources,
+            ):
+                start = time.perf_counter()
+                getattr(generator, loader)(path)
+                loaders[loader] = time.perf_counter() - start
+
+            AutoTitleGenerator(*sources, cache_file=cache_file)  # 写入缓存
+            start = time.perf_counter()
+            AutoTitleGenerator(*sources, cache_file=cache_file)
+            startup_cached = time.perf_counter() - start
+            generator.write_snapshot(snapshot_file)
+            start = time.perf_counter()
+            AutoTitleGenerator(snapshot_file=snapshot_file)
+            startup_snapshot = time.perf_counter() - start
+
+            styles = {
+                str(style): _titles_per_second(
+                    getattr(generator, f"generate_style{style}"), titles
+                )
+                for style in sorted(generator.compiled_styles)
+            }
+            start = time.perf_counter()
+            generator.generate_random_batch(titles)
+            random_batch = titles / (time.perf_counter() - start)
+
+        results.append(
+            {
+                "scale": scale,
+                "vocabulary_words": sum(len(w) for w in generator.vocabulary.values()),
+                "characters": sum(len(c) for c in generator.character_pool.values()),
+                "loader_seconds": loaders,
+                "startup_seconds": startup,
+                "startup_cached_seconds": startup_cached,
+                "startup_snapshot_seconds": startup_snapshot,
+                "memory_bytes": memory,
+                "memory_peak_bytes": memory_peak,
+                "style_titles_per_second": styles,
+                "random_batch_titles_per_second": random_batch,
+            }
+        )
+    return {
+        "python": platform.python_version(),
+        "numpy": _import_numpy() is not None,
+        "titles_per_measurement": titles,
+        "results": results,
+    }
+
+
+SERVER_MAX_COUNT = 10_000  # 单个请求最多生成的标题数
+SERVER_MAX_BATCH = 256  # 每轮合并处理的最大请求数
+SERVER_BULK_MIN = 256  # 一轮中合并后的标题数达到该值时用 generate_bulk 向量化生成
+SERVER_OFFLOAD_MIN = 2048  # 一轮请求的标题总数达到该值时放到线程池生成，不阻塞事件循环
+_HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+}
+
+
+class TitleServer:
+    """
+    常驻的标题生成服务：持有一个预热好的生成器，通过 HTTP/JSON 提供
+    GET /generate?style=&character=&count=&seed= 和 GET /health。
+    并发到达的请求先进入队列，由单个任务按批取出：未指定 seed 的请求按
+    (风格, 角色) 合并成一次生成再切分，数量大时走 generate_bulk。
+    """
+
+    def __init__(
+        self,
+        generator: "AutoTitleGenerator",
+        max_count: int = SERVER_MAX_COUNT,
+        max_batch: int = SERVER_MAX_BATCH,
+    ):
+        self.generator = generator
+        self.max_count = max_count
+        self.max_batch = max_batch
+        self._queue = None
+        self._batch_task = None
+        self._deferred = None  # 线程池生成期间推迟执行的热加载替换
+
+    def handle_query(self, target: str) -> Tuple[int, Dict]:
+        """
+        处理一个请求目标（路径+查询串），返回 (状态码, JSON对象)，不涉及网络，便于离线测试。
+        /metrics 默认返回 Prometheus 文本（字符串），加 ?format=json 时返回JSON对象。
+        """
+        status, result = self._parse_request(target)
+        if status is not None:
+            return status, result
+        return 200, {"titles": self._generate_titles(*result)}
+
+    def _parse_request(self, target: str):
+        """
+        解析请求目标。/generate 的合法请求返回 (None, (风格, 角色, 数量, 种子))，
+        其余请求（含参数错误）直接返回 (状态码, 结果)。
+        """
+        from urllib.parse import parse_qs, urlsplit
+
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, {"status": "ok"}
+        if url.path == "/metrics":
+            metrics = self.generator.metrics
+            if metrics is None:
+                return 404, {"error": "未开启统计，请使用 --metrics 启动服务"}
+            if parse_qs(url.query).get("format") == ["json"]:
+                return 200, metrics.to_dict()
+            return 200, metrics.to_prometheus()
+        if url.path != "/generate":
+            return 404, {"error": f"未知路径 {url.path}"}
+
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            style = int(query["style"]) if query.get("style") else None
+            count = int(query.get("count") or 1)
+            seed = int(query["seed"]) if query.get("seed") else None
+        except ValueError:
+            return 400, {"error": "style、count、seed 必须是整数"}
+        if style is not None and style not in self.generator.compiled_styles:
+            return 400, {
+                "error": f"无效的风格编号，可选：{list(self.generator.compiled_styles)}"
+            }
+        if not 1 <= count <= self.max_count:
+            return 400, {"error": f"count 必须在 1 到 {self.max_count} 之间"}
+
+        return None, (style, query.get("character") or None, count, seed)
+
+    def _generate_titles(
+        self, style: int, character: str, count: int, seed: int = None
+    ) -> List[str]:
+        """逐个生成 count 个标题；指定 seed 时使用独立的随机数生成器，结果可复现"""
+        rng = random.Random(seed) if seed is not None else None
+        style_rng = rng or self.generator.rng
+        return [
+            self.generator._generate_style(
+                style if style is not None else style_rng.randint(1, 5),
+                character,
+                rng,
+            )
+            for _ in range(count)
+        ]
+
+    def _generate_shared(self, style: int, character: str, count: int) -> List[str]:
+        """为合并后的一组请求一次生成全部标题，数量大且有 NumPy 时向量化"""
+        if count >= SERVER_BULK_MIN and _import_numpy() is not None:
+            return self.generator.generate_bulk(count, None, style, character)
+        return self._generate_titles(style, character, count)
+
+    def _process_batch(self, batch: List[Tuple[Tuple, object]]) -> List[Tuple]:
+        """
+        处理一批 ((风格, 角色, 数量, 种子), future)：指定 seed 的请求各自生成以保证
+        可复现，其余按 (风格, 角色) 合并为一次生成后按各自数量切分。
+        不直接设置 future（可在线程池中执行），返回 (future, 结果, 异常) 列表。
+        """
+        outcomes = []
+        groups: Dict[Tuple[int, str], List[Tuple[int, object]]] = {}
+        for request, future in batch:
+            style, character, count, seed = request
+            if seed is not None:
+                try:
+                    titles = self._generate_titles(*request)
+                except Exception as e:
+                    outcomes.append((future, None, e))
+                else:
+                    outcomes.append((future, (200, {"titles": titles}), None))
+                continue
+            groups.setdefault((style, character), []).append((count, future))
+        for (style, character), requests in groups.items():
+            try:
+                titles = self._generate_shared(
+                    style, character, sum(count for count, _ in requests)
+                )
+            except Exception as e:
+                outcomes.extend((future, None, e) for _, future in requests)
+                continue
+            start = 0
+            for count, future in requests:
+                outcomes.append(
+                    (future, (200, {"titles": titles[start : start + count]}), None)
+                )
+                start += count
+        return outcomes
+
+    async def _run_batches(self):
+        """
+        从队列中成批取出请求并合并处理。一轮的标题总数达到 SERVER_OFFLOAD_MIN 时
+        在线程池中生成，事件循环继续处理其他连接；同一时间只有一轮在生成。
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            batch = [
+                (request, future) for request, future in batch if not future.done()
+            ]
+            if sum(request[2] for request, _ in batch) >= SERVER_OFFLOAD_MIN:
+                self._deferred = []
+                try:
+                    outcomes = await loop.run_in_executor(
+                        None, self._process_batch, batch
+                    )
+                finally:
+                    deferred, self._deferred = self._deferred, None
+                    for callback, *args in deferred:
+                        callback(*args)
+            else:
+                outcomes = self._process_batch(batch)
+            for future, result, error in outcomes:
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+    def _call_when_idle(self, callback, *args):
+        """在事件循环中执行热加载的替换；线程池正在生成时推迟到该轮结束再执行"""
+        if self._deferred is None:
+            callback(*args)
+        else:
+            self._deferred.append((callback, *args))
+
+    async def submit(self, target: str) -> Tuple[int, Dict]:
+        """
+        解析请求；需要生成标题的放入批处理队列并等待结果，其余（/health、
+        /metrics、参数错误）直接返回，不排在正在生成的大请求之后。
+        """
+        import asyncio
+
+        status, result = self._parse_request(target)
+        if status is not None:
+            return status, result
+        if self._batch_task is None:
+            self._queue = asyncio.Queue()
+            self._batch_task = asyncio.ensure_future(self._run_batches())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((result, future))
+        return await future
+
+    async def handle_connection(self, reader, writer):
+        """处理一个 HTTP/1.1 连接，支持 keep-alive"""
+        import asyncio
+
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                parts = lines[0].split()
+                if len(parts) != 3:
+                    break
+                method, target, version = parts
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                try:
+                    body_length = int(headers.get("content-length") or 0)
+                    if body_length < 0:
+                        raise ValueError(body_length)
+                except ValueError:
+                    # 无法确定请求体边界，回复后关闭连接
+                    status, payload = 400, {"error": "Content-Length 无效"}
+                    keep_alive = False
+                else:
+                    if body_length:
+                        await reader.readexactly(body_length)
+                    if method != "GET":
+                        status, payload = 405, {"error": "只支持 GET"}
+                    else:
+                        status, payload = await self.submit(target)
+
+                if isinstance(payload, str):
+                    body = payload.encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                    content_type = "application/json; charset=utf-8"
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {_HTTP_REASONS[status]}\r\n"
+                        f"Content-Type: {content_type}\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                        "\r\n"
+                    ).encode("latin-1")
+                    + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 8765, unix_socket: str = None
+    ):
+        """启动监听：指定 unix_socket 时监听 Unix 域套接字，否则监听 TCP 端口"""
+        import asyncio
+
+        if unix_socket:
+            return await asyncio.start_unix_server(self.handle_connection, unix_socket)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def serve_forever(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        unix_socket: str = None,
+        reload_interval: float = None,
+    ):
+        """阻塞运行服务直到被中断；reload_interval 为轮询源文件的间隔（秒），None 表示不热加载"""
+        import asyncio
+
+        async def run():
+            server = await self.start(host, port, unix_socket)
+            if reload_interval:
+                # 替换动作投递到事件循环执行，同一个请求内的标题总是来自同一份词库
+                loop = asyncio.get_running_loop()
+                self.generator.start_auto_reload(
+                    reload_interval,
+                    lambda *call: loop.call_soon_threadsafe(self._call_when_idle, *call),
+                )
+            address = unix_socket or f"http://{host}:{port}"
+            print(f"标题生成服务已启动: {address}", file=sys.stderr)
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(run())
+        except KeyboardInterrupt:
+            pass
+
+
+def _write_metrics(generator: AutoTitleGenerator, args):
+    """按 --metrics 指定的格式输出统计：写入 --metrics-file，未指定时打印到标准错误"""
+    if generator.metrics is None:
+        return
+    if args.metrics == "prometheus":
+        text = generator.metrics.to_prometheus()
+    else:
+        text = json.dumps(generator.metrics.to_dict(), ensure_ascii=False, indent=2)
+        text += "\n"
+    if args.metrics_file:
+        with open(args.metrics_file, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"统计已保存到: {args.metrics_file}", file=sys.stderr)
+    else:
+        sys.stderr.write(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全自动标题生成器 v4")
+    parser.add_argument(
+        "-s",
+        "--style",
+        type=int,
+        choices=[1, 2, 3, 4, 5, 6, 7],  # 更新这里
+        help="命名风格 (1-7)，不指定则随机",
+    )
+
+    parser.add_argument("-c", "--character", type=str, help="角色名称，不指定则随机")
+    parser.add_argument("-n", "--count", type=int, default=1, help="生成数量")
+    parser.add_argument(
+        "-a", "--all", action="store_true", help="生成所有风格（每个风格生成N个）"
+    )
+    parser.add_argument("-o", "--output", type=str, help="输出到文件")
+    parser.add_argument(
+        "--compress",
+        choices=COMPRESS_CODECS,
+        help="压缩输出：后台线程把输出按约8MB分块压缩成独立成员，可整体或逐成员解压",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="text",
+        help="输出格式：text=每行一个标题（默认）；jsonl/csv/parquet/arrow 为带风格、句式、"
+        "角色、分类、种子、序号的结构化记录，按块流式写出（parquet/arrow 需安装 pyarrow 并指定-o）",
+    )
+    parser.add_argument("--vocab", action="store_true", help="显示词汇库统计")
+    parser.add_argument("--chars", action="store_true", help="显示角色池统计")
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="与--chars连用，报告加载时规范化和移除的重复角色数",
+    )
+    parser.add_argument(
+        "--analyze",
+        action="store_true",
+        help="分析各风格/句式的标题空间大小、熵和期望重复率（批量大小取--batch或-n）",
+    )
+    parser.add_argument(
+        "--enumerate",
+        action="store_true",
+        help="逐行输出指定风格（-s，不指定则为1-5）能生成的全部标题",
+    )
+    parser.add_argument(
+        "--sample-unique",
+        action="store_true",
+        help="按--batch或-n数量从全部标题中无放回均匀抽样，结果保证不重复",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="以常驻服务运行，提供 GET /generate?style=&character=&count=&seed=",
+    )
+    parser.add_argument(
+        "--host", type=str, default="127.0.0.1", help="与--serve连用，监听地址"
+    )
+    parser.add_argument(
+        "--port", type=int, default=8765, help="与--serve连用，监听端口（默认8765）"
+    )
+    parser.add_argument(
+        "--unix-socket",
+        type=str,
+        help="与--serve连用，改为监听该 Unix 域套接字路径",
+    )
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        help="与--serve连用，每隔若干秒检查 name.md/characters.json 等源文件，变化时后台重新加载",
+    )
+    parser.add_argument(
+        "--metrics",
+        choices=("json", "prometheus"),
+        help="开启统计（各风格/句式次数、渲染耗时、回退次数），生成结束后按该格式输出；"
+        "与--serve连用时通过 GET /metrics 提供",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        help="与--metrics连用，统计写入该文件而不是标准错误",
+    )
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="用合成词库运行基准测试，输出 JSON（可配合 -o 保存）",
+    )
+    parser.add_argument(
+        "--bench-scales",
+        type=str,
+        default="1,10,100",
+        help="与--bench连用，逗号分隔的数据规模倍数（默认1,10,100）",
+    )
+    parser.add_argument(
+        "--bench-titles",
+        type=int,
+        default=20_000,
+        help="与--bench连用，每项速度测量生成的标题数（默认20000）",
+    )
+    parser.add_argument(
+        "--build-snapshot",
+        type=str,
+        metavar="FILE",
+        help="把解析好的词库和角色池写成二进制快照，供多个进程 mmap 共享",
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=str,
+        metavar="FILE",
+        help="从 --build-snapshot 生成的快照加载，不读取 name.md/characters.json",
+    )
+    parser.add_argument(
+        "--add-char",
+        type=str,
+        nargs=2,
+        metavar=("CATEGORY", "NAME"),
+        help="添加新角色：--add-char 分类名 角色名",
+    )
+    parser.add_argument(
+        "--add-chars-from",
+        type=str,
+        metavar="FILE",
+        help="从文本文件批量添加角色，每行「分类名<TAB>角色名」，没有制表符时整行是角色名、归入自定义角色",
+    )
+    parser.add_argument(
+        "--import-chars",
+        type=str,
+        metavar="FILE",
+        help="流式导入 CSV/JSONL/文本角色文件，角色名在所有分类中去重，一次提交",
+    )
+    parser.add_argument(
+        "--import-format",
+        choices=IMPORT_FORMATS,
+        default="auto",
+        help="与--import-chars连用，文件格式（默认按扩展名判断）",
+    )
+    parser.add_argument(
+        "--remove-char",
+        type=str,
+        nargs=2,
+        metavar=("CATEGORY", "NAME"),
+        help="删除角色：--remove-char 分类名 角色名",
+    )
+    parser.add_argument(
+        "--compact-chars",
+        action="store_true",
+        help="把角色池增量日志合并回 characters.json",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        help="批量生成指定数量的标题，每个标题独立随机风格/角色。默认 random_style=True, random_character=True",
+    )
+    parser.add_argument(
+        "--fixed-style",
+        action="store_true",
+        help="与--batch连用，使批量生成时所有标题风格固定（随机选定一种）",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="随机种子，指定后同参数的输出可复现"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="与--batch连用，多进程分片生成（按分片顺序合并，指定种子时输出与进程数无关，"
+        "包括 --workers 1）",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        type=str,
+        help="与--workers连用，各分片直接写入该目录下的 shard_NNNNN.txt",
+    )
+    parser.add_argument(
+        "--unique",
+        action="store_true",
+        help="批量标题去重：小批量用精确集合，大批量用布隆过滤器",
+    )
+    parser.add_argument(
+        "--diversity",
+        type=float,
+        metavar="THRESHOLD",
+        help="批量近似去重：字符 n-gram 的 Jaccard 相似度超过该阈值（0-1，如0.7）的标题被重新生成",
+    )
+    parser.add_argument(
+        "--diversity-ngram",
+        type=int,
+        default=2,
+        help="与--diversity连用，切分标题的字符 n-gram 长度（默认2）",
+    )
+    parser.add_argument(
+        "--min-similarity",
+        type=float,
+        help="只保留与 rules.md 同风格最近示例的字符二元组 Jaccard 相似度不低于该值的标题（0-1）",
+    )
+    parser.add_argument(
+        "--max-similarity",
+        type=float,
+        help="只保留与最近示例的相似度不高于该值的标题（0-1），可过滤过于雷同示例的标题",
+    )
+    parser.add_argument(
+        "--similarity-report",
+        action="store_true",
+        help="批量生成时为每个标题与 rules.md 示例的相似度评分，结束时输出分布报告",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=100,
+        help="与--unique、--diversity或相似度过滤连用，每个标题被拒绝时的最大重试次数（默认100）",
+    )
+    parser.add_argument(
+        "--bloom-error-rate",
+        type=float,
+        default=0.001,
+        help="与--unique连用，布隆过滤器的误判率（默认0.001）",
+    )
+    parser.add_argument(
+        "--exact-limit",
+        type=int,
+        default=EXACT_DEDUP_LIMIT,
+        help=f"与--unique连用，数量不超过该值时用精确去重（默认{EXACT_DEDUP_LIMIT}）",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="边生成边写出标题（不带序号），内存占用与数量无关；配合-o写文件，否则写标准输出",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="不读写解析缓存（缺省位于 ~/.cache/auto_title_generator/，按源文件路径区分）",
+    )
+    parser.add_argument(
+        "--char-weighting",
+        choices=CHARACTER_WEIGHTINGS,
+        default="category",
+        help="随机角色的权重：category=先均匀选类别（默认），character=每个角色等概率",
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="与--batch连用，使用 NumPy 一次性批量采样（适合千万级批量，需安装 numpy）",
+    )
+    parser.add_argument(
+        "--fixed-char",
+        action="store_true",
+        help="与--batch连用，使批量生成时所有标题角色固定（随机选定一个）",
+    )
+
+    args = parser.parse_args()
+    if args.compress:
+        if args.format in ("parquet", "arrow"):
+            parser.error(f"--format {args.format} 自带列压缩，不能与 --compress 同时使用")
+        if args.shard_dir:
+            parser.error("--compress 暂不支持 --shard-dir 分片文件")
+        # 带序号的屏幕输出不经过压缩，只有写文件或流式输出时才有意义
+        if not (args.output or args.stream or args.enumerate or args.format != "text"):
+            parser.error("--compress 需要与 -o 或 --stream 一起使用")
+    if args.format != "text":
+        if args.format in ("parquet", "arrow"):
+            if not args.output:
+                parser.error(f"--format {args.format} 需要用 -o 指定输出文件")
+            if _import_pyarrow() is None:
+                parser.error(f"--format {args.format} 需要安装 pyarrow")
+        if args.shard_dir or args.sample_unique or args.enumerate or args.all:
+            parser.error(
+                "--format 结构化输出不能与 --shard-dir/--sample-unique/--enumerate/-a 同时使用"
+            )
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers 必须是正整数")
+    parallel = args.workers is not None and args.workers > 1
+    if args.unique and parallel:
+        parser.error("--unique 暂不支持与 --workers 同时使用")
+    for flag, value in (
+        ("--min-similarity", args.min_similarity),
+        ("--max-similarity", args.max_similarity),
+    ):
+        if value is not None and not 0 <= value <= 1:
+            parser.error(f"{flag} 必须在 0 和 1 之间")
+        # 与 --unique 相同：过滤要预留重试候选，多进程会提前生成全部候选
+        if value is not None and parallel:
+            parser.error(f"{flag} 暂不支持与 --workers 同时使用")
+    if args.diversity is not None:
+        if parallel:
+            parser.error("--diversity 暂不支持与 --workers 同时使用")
+        if not 0 < args.diversity < 1:
+            parser.error("--diversity 的阈值必须在 0 和 1 之间")
+
+    # 初始化生成器
+    if args.bench:
+        # 基准测试使用临时目录中的合成数据，不加载当前目录的源文件
+        try:
+            scales = [int(scale) for scale in args.bench_scales.split(",") if scale]
+        except ValueError:
+            parser.error("--bench-scales 必须是逗号分隔的正整数")
+        report = run_benchmark(scales, args.bench_titles, args.seed or 0)
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+            print(f"基准测试结果已保存到: {args.output}", file=sys.stderr)
+        else:
+            print(text)
+        return
+
+    if args.snapshot and (
+        args.add_char
+        or args.add_chars_from
+        or args.import_chars
+        or args.remove_char
+        or args.compact_chars
+    ):
+        parser.error("--snapshot 加载的角色池是只读的，不能与修改角色池的参数同时使用")
+
+    # 未指定种子时抽取一个具体的主种子，生成和结构化输出的 seed 列都用它，
+    # 这样任何一次输出都能用记录中的种子复现
+    if args.seed is None:
+        args.seed = random.SystemRandom().randrange(2**63)
+
+    generator = AutoTitleGenerator(
+        character_weighting=args.char_weighting,
+        cache_file=None if args.no_cache else DEFAULT_CACHE_FILE,
+        seed=args.seed,
+        snapshot_file=args.snapshot,
+    )
+    if args.metrics:
+        generator.enable_metrics()
+
+    # --- 特殊功能参数处理 ---
+    if args.build_snapshot:
+        generator.write_snapshot(args.build_snapshot)
+        print(f"已写入快照: {args.build_snapshot}")
+        return
+
+    if args.add_char:
+        category, name = args.add_char
+        generator.add_character(category, name)
+        return
+
+    if args.add_chars_from:
+        added = generator.add_characters(
+            iter_character_records(args.add_chars_from, "text")
+        )
+        print(f"已添加 {added} 个新角色")
+        return
+
+    if args.import_chars:
+        read = 0
+
+        def counted(records):
+            nonlocal read
+            for record in records:
+                read += 1
+                yield record
+
+        added = generator.add_characters(
+            counted(iter_character_records(args.import_chars, args.import_format)),
+            unique_across_categories=True,
+        )
+        print(f"已导入 {added} 个新角色（读取 {read} 条，跳过 {read - added} 条重复）")
+        return
+
+    if args.remove_char:
+        category, name = args.remove_char
+        generator.remove_character(category, name)
+        return
+
+    if args.compact_chars:
+        generator.compact_character_pool()
+        print(f"已将角色池日志合并到 {generator.character_pool_file}")
+        return
+
+    if args.serve:
+        TitleServer(generator).serve_forever(
+            args.host, args.port, args.unix_socket, args.reload_interval
+        )
+        return
+
+    if args.vocab:
+        print("\n=== 词汇库统计 ===")
+        for category, words in generator.vocabulary.items():
+            print(f"{category}: {len(words)} 个词汇")
+            if len(words) > 0:
+                print(f"  示例: {', '.join(words[:5])}")
+        return
+
+    if args.chars:
+        generator.show_character_pool(show_stats=args.stats)
+        return
+
+    if args.analyze:
+        generator.show_space_analysis(args.batch or args.count, args.character)
+        return
+
+    if args.enumerate:
+        written = stream_titles(
+            generator.iter_all_titles(args.style, args.character),
+            args.output,
+            args.compress,
+        )
+        if args.output:
+            print(f"已写出 {written} 个标题到: {args.output}", file=sys.stderr)
+        return
+
+    sample_iter = None
+    if args.sample_unique:
+        total = args.batch or args.count
+        space = generator.title_space(args.style, args.character)
+        if total > space.size:
+            print(
+                f"警告: 标题空间只有 {space.size} 个，无法抽取 {total} 个不重复标题",
+                file=sys.stderr,
+            )
+            total = space.size
+        sample_iter = space.sample(total, generator.rng)
+        if args.stream:
+            stream_titles(sample_iter, args.output, args.compress)
+            return
+
+    # --- 标题生成逻辑 ---
+    titles = []
+    style_names = STYLE_NAMES
+
+    if args.shard_dir:
+        # 分片文件模式：各工作进程直接写文件
+        style = args.style
+        if style is None and args.fixed_style:
+            style = generator.rng.randint(1, 5)
+        fixed_character = args.character
+        if fixed_character is None and args.fixed_char:
+            fixed_character = generator.get_random_character()
+        paths = generator.write_shards(
+            args.batch or args.count,
+            args.workers or 1,
+            args.shard_dir,
+            seed=args.seed,
+            style=style,
+            character=fixed_character,
+        )
+        print(f"已写出 {len(paths)} 个分片到: {args.shard_dir}")
+        return
+
+    if args.format != "text":
+        # 结构化输出：标题连同生成元数据按块流式写出
+        records, reports = _batch_title_iter(
+            generator, args, args.batch or args.count, records=True
+        )
+        written = write_records(
+            records, args.output, args.format, args.seed, compress=args.compress
+        )
+        if args.output:
+            print(f"已写出 {written} 条记录到: {args.output}", file=sys.stderr)
+        for stats in reports:
+            print(stats.report(), file=sys.stderr)
+        _write_metrics(generator, args)
+        return
+
+    if args.stream:
+        # 流式模式：不在内存中保留标题，直接写出
+        title_iter, reports = _batch_title_iter(
+            generator, args, args.batch or args.count
+        )
+        written = stream_titles(title_iter, args.output, args.compress)
+        if args.output:
+            print(f"已写出 {written} 个标题到: {args.output}", file=sys.stderr)
+        for stats in reports:
+            print(stats.report(), file=sys.stderr)
+        _write_metrics(generator, args)
+        return
+
+    if sample_iter is not None:
+        # 无放回抽样模式
+        titles = list(sample_iter)
+        print(f"\n=== 无放回抽样 {len(titles)} 个标题 ===")
+        for i, title in enumerate(titles, 1):
+            print(f"{i}. {title}")
+
+    elif (
+        args.batch
+        and (args.bulk or args.workers is not None)
+        or args.unique
+        or args.diversity is not None
+        or args.min_similarity is not None
+        or args.max_similarity is not None
+        or args.similarity_report
+    ):
+        # 批量采样/多进程分片/去重模式
+        total = args.batch or args.count
+        title_iter, reports = _batch_title_iter(generator, args, total)
+        titles = list(title_iter)
+        print(f"\n=== 批量生成 {total} 个标题 ===")
+        for i, title in enumerate(titles, 1):
+            print(f"{i}. {title}")
+        for stats in reports:
+            print(f"\n{stats.report()}")
+
+    elif args.batch:
+        # 使用 --batch 模式，提供灵活的随机/固定选项
+        titles = generator.generate_random_batch(
+            total_count=args.batch,
+            random_style=not args.fixed_style,
+            random_character=not args.fixed_char
+            and args.character is None,  # 只有当没有--fixed-char且没有-c时才随机角色
+            fixed_character_name=args.character,  # 如果-c指定了角色，则将其作为固定角色
+        )
+        print(f"\n=== 批量生成 {args.batch} 个标题 ===")
+        for i, title in enumerate(titles, 1):
+            print(f"{i}. {title}")
+
+    elif args.all:
+        # 生成所有风格的标题，每个风格生成N个
+        results = generator.generate_all_styles(args.character, args.count)
+        print("\n=== 所有风格标题 ===")
+        for style, style_titles in results.items():
+            print(f"\n风格{style} ({style_names[style]}):")
+            for i, title in enumerate(style_titles, 1):
+                print(f"  {i}. {title}")
+        # 将所有标题扁平化以便后续文件输出
+        titles = [t for sublist in results.values() for t in sublist]
+
+    else:
+        # 默认模式：根据-s和-n参数进行生成
+        if args.style is not None:
+            # 用户明确指定了风格 (-s X)，生成 N 个该风格的标题
+            titles = generator.generate(args.style, args.character, args.count)
+            style_name = style_names.get(args.style, f"风格{args.style}")
+            print(f"\n=== {style_name} 标题 ===")
+            for i, title in enumerate(titles, 1):
+                print(f"{i}. {title}")
+        else:
+            # 用户未指定风格 (-s)，但可能指定了数量 (-n N)。
+            # 这符合用户期望的“每个标题独立随机风格”的情况。
+            titles = generator.generate_random_batch(
+                total_count=args.count,
+                random_style=True,  # 每个标题都独立随机选择风格
+                random_character=(
+                    args.character is None
+                ),  # 如果没指定-c，则每个标题角色也随机
+                fixed_character_name=args.character,  # 如果-c指定了角色，则用该角色
+            )
+            print(f"\n=== 随机风格批量标题 ({args.count}个) ===")
+            for i, title in enumerate(titles, 1):
+                print(f"{i}. {title}")
+
+    # --- 输出到文件 ---
+    if args.output and titles:  # 确保有标题才输出
+        with _open_text_output(args.output, compress=args.compress) as f:
+            for title in titles:
+                f.write(f"{title}\n")
+        print(f"\n结果已保存到: {args.output}")
+    elif args.output and not titles:
+        print(f"\n没有生成任何标题，因此未保存到文件: {args.output}")
+
+    _write_metrics(generator, args)
@@ -119,6 +119,8 @@ class AutoTitleGenerator:
                 custom_pool = json.load(f)
                 # 合并自定义池和默认池
                 for category, characters in custom_pool.items():
+                    if category.startswith("__"):
+                        continue  # 跳过 __weights__ / __removed__ 等保留键
                     if category in default_pool:
                         # 使用集合进行去重合并，保持原有顺序并添加新的
                         existing_chars = set(default_pool[category])